@@ -0,0 +1,216 @@
+"""
+This module archives every crawled post to gzip-compressed JSONL segment files.
+
+Crawler threads only put batches on a queue. A single writer thread buffers records,
+writes them, and rotates segments by size or age. When a segment is closed, a line is appended
+to `index.jsonl` with its time range, so `read_archive()` only opens segments that overlap the range.
+A segment left open by a crash is indexed on the next `prepare()`.
+"""
+
+import datetime
+import fnmatch
+import gzip
+import json
+import os
+import queue
+import time
+import zlib
+from threading import Thread
+from typing import Iterator
+
+from loguru import logger
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.post import Batch
+
+
+const_index_file_name = "index.jsonl"
+const_segment_file_pattern = "segment-*.jsonl.gz"
+
+
+class ArchiveSegment:
+
+    __slots__ = ("file_name", "raw_file", "gzip_file", "opened_at", "first_time", "last_time", "count")
+
+    def __init__(self, directory: str, opened_at: float):
+        timestamp = datetime.datetime.fromtimestamp(opened_at, datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        self.file_name = f"segment-{timestamp}.jsonl.gz"
+        self.raw_file = open(os.path.join(directory, self.file_name), "xb")
+        self.gzip_file = gzip.GzipFile(fileobj=self.raw_file, mode="wb")
+        self.opened_at = opened_at
+        self.first_time = None
+        self.last_time = None
+        self.count = 0
+
+    def write(self, lines: list, first_time: float, last_time: float) -> None:
+        self.gzip_file.write("".join(lines).encode("utf-8"))
+        # A sync flush keeps everything written so far readable, even if the process dies.
+        self.gzip_file.flush(zlib.Z_SYNC_FLUSH)
+        if self.first_time is None:
+            self.first_time = first_time
+        self.last_time = last_time
+        self.count += len(lines)
+
+    def get_size(self) -> int:
+        return self.raw_file.tell()
+
+    def close(self) -> dict:
+        self.gzip_file.close()
+        self.raw_file.close()
+        return {
+            "file": self.file_name,
+            "first_time": self.first_time,
+            "last_time": self.last_time,
+            "count": self.count,
+        }
+
+
+class ArchiveSinkForJsonl:
+
+    def __init__(self):
+        self.directory = None
+        self.max_segment_size_in_bytes = 64 * 1024 * 1024
+        self.max_segment_age_in_sec = 60 * 60
+        self.flush_interval_in_sec = 5
+        self.max_buffered_records = 256
+
+        self.record_queue = queue.Queue()
+        self.writer_thread = None
+        self.segment = None
+        self.stop_requested = False
+
+    def prepare(self, global_config: GlobalConfigIR) -> None:
+        local_config = global_config.config["archive"]["jsonl"]["config"]
+        self.directory = local_config["directory"]
+        self.max_segment_size_in_bytes = int(local_config.get("max_segment_size_in_bytes", self.max_segment_size_in_bytes))
+        self.max_segment_age_in_sec = float(local_config.get("max_segment_age_in_sec", self.max_segment_age_in_sec))
+        self.flush_interval_in_sec = float(local_config.get("flush_interval_in_sec", self.flush_interval_in_sec))
+        self.max_buffered_records = int(local_config.get("max_buffered_records", self.max_buffered_records))
+        os.makedirs(self.directory, exist_ok=True)
+        self._index_unindexed_segments()
+
+    def start(self, global_control_context: dict) -> None:
+        self.writer_thread = Thread(target=self._run_loop, name="ArchiveSinkForJsonl::writer", args=(global_control_context,), daemon=True)
+        self.writer_thread.start()
+
+    def archive(self, batch: Batch) -> None:
+        """
+        Queues |batch| for the writer thread. It never blocks on I/O.
+        """
+        archived_at = time.time()
+        for post in batch.posts:
+            self.record_queue.put((archived_at, post.to_dict()))
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Flushes queued records, closes the current segment and waits for the writer thread.
+        """
+        self.stop_requested = True
+        if self.writer_thread is not None:
+            self.writer_thread.join(timeout=timeout)
+
+    def _run_loop(self, global_control_context: dict) -> None:
+        lines = []
+        first_time = None
+        last_time = None
+        last_flush_time = time.monotonic()
+        while True:
+            stopping = self.stop_requested or global_control_context["exit_event"].is_set()
+            try:
+                (archived_at, record) = self.record_queue.get(timeout=0 if stopping else self.flush_interval_in_sec)
+                record["archived_at"] = archived_at
+                lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+                if first_time is None:
+                    first_time = archived_at
+                last_time = archived_at
+            except queue.Empty:
+                pass
+
+            is_drained = self.record_queue.empty()
+            if lines and (stopping and is_drained or len(lines) >= self.max_buffered_records or time.monotonic() - last_flush_time >= self.flush_interval_in_sec):
+                self._write(lines, first_time, last_time)
+                lines = []
+                first_time = None
+                last_flush_time = time.monotonic()
+            if stopping and is_drained and not lines:
+                break
+        self._close_segment()
+        logger.info("[ArchiveSinkForJsonl] Writer thread exited.")
+
+    def _write(self, lines: list, first_time: float, last_time: float) -> None:
+        try:
+            if self.segment is not None:
+                is_too_large = self.segment.get_size() >= self.max_segment_size_in_bytes
+                is_too_old = time.time() - self.segment.opened_at >= self.max_segment_age_in_sec
+                if is_too_large or is_too_old:
+                    self._close_segment()
+            if self.segment is None:
+                self.segment = ArchiveSegment(self.directory, time.time())
+            self.segment.write(lines, first_time, last_time)
+        except OSError as e:
+            logger.error(f"[ArchiveSinkForJsonl] Failed to write ({len(lines)}) records: {e}")
+
+    def _close_segment(self) -> None:
+        if self.segment is None:
+            return
+        segment = self.segment
+        self.segment = None
+        self._append_index_entry(segment.close())
+
+    def _append_index_entry(self, index_entry: dict) -> None:
+        if index_entry["count"] == 0:
+            return
+        with open(os.path.join(self.directory, const_index_file_name), "a", encoding="utf-8") as index_file:
+            index_file.write(json.dumps(index_entry) + "\n")
+
+    def _index_unindexed_segments(self) -> None:
+        """
+        Indexes segments which were never closed, e.g. the one being written when the process died.
+        Its records up to the last flush are readable. See `ArchiveSegment.write()`.
+        """
+        indexed_file_names = {index_entry["file"] for index_entry in read_index(self.directory)}
+        for file_name in sorted(fnmatch.filter(os.listdir(self.directory), const_segment_file_pattern)):
+            if file_name in indexed_file_names:
+                continue
+            index_entry = {"file": file_name, "first_time": None, "last_time": None, "count": 0}
+            for record in read_segment(os.path.join(self.directory, file_name)):
+                if index_entry["first_time"] is None:
+                    index_entry["first_time"] = record["archived_at"]
+                index_entry["last_time"] = record["archived_at"]
+                index_entry["count"] += 1
+            logger.info(f"[ArchiveSinkForJsonl] Indexing ({index_entry['count']}) records of unclosed segment ({file_name})...")
+            self._append_index_entry(index_entry)
+
+
+def read_index(directory: str) -> list:
+    index_path = os.path.join(directory, const_index_file_name)
+    if not os.path.exists(index_path):
+        return []
+    with open(index_path, "r", encoding="utf-8") as index_file:
+        return [json.loads(line) for line in index_file if line.strip()]
+
+
+def read_segment(path: str) -> Iterator[dict]:
+    """
+    Yields the records of the segment at |path|. A segment which was not closed ends without a gzip trailer,
+    possibly after a partial line. It's read up to there.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as segment_file:
+        try:
+            for line in segment_file:
+                yield json.loads(line)
+        except (EOFError, zlib.error, gzip.BadGzipFile, ValueError) as e:
+            logger.warning(f"[ArchiveSinkForJsonl] Segment ({path}) ends early: {e}")
+
+
+def read_archive(directory: str, start_time: float, end_time: float) -> Iterator[dict]:
+    """
+    Yields archived records with `archived_at` in [|start_time|, |end_time|].
+    Only segments listed in the index are read, so the segment being written now is not included.
+    """
+    for index_entry in read_index(directory):
+        if index_entry["last_time"] < start_time or index_entry["first_time"] > end_time:
+            continue
+        for record in read_segment(os.path.join(directory, index_entry["file"])):
+            if start_time <= record["archived_at"] <= end_time:
+                yield record
@@ -0,0 +1,105 @@
+import random
+import time
+
+from loguru import logger
+
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class BoardHealthTracker:
+    """
+    It tracks the health of one board and decides when to fetch next.
+
+    - Closed: fetches run every `interval_in_sec`. Failures back off with decorrelated jitter.
+    - Open: after `failure_threshold` consecutive failures, no fetch runs until the backoff delay passes.
+    - Half-open: one trial fetch is allowed. Success closes the breaker. Failure opens it again.
+
+    The fetch timeout doubles on each timeout up to `timeout_upper_limit_in_sec`.
+    It goes back to `timeout_lower_limit_in_sec` after a success.
+    """
+
+    def __init__(self, board_id: str, clock=time.monotonic, rng: random.Random | None = None):
+        self.board_id = board_id
+        self.clock = clock
+        self.rng = rng if rng is not None else random.Random()
+
+        self.interval_in_sec = 15.0
+        self.failure_threshold = 3
+        self.backoff_base_in_sec = 15.0
+        self.backoff_cap_in_sec = 600.0
+        self.timeout_lower_limit_in_sec = 8.0
+        self.timeout_upper_limit_in_sec = 64.0
+
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self.total_failures = 0
+        self.total_successes = 0
+        self.timeout_in_sec = self.timeout_lower_limit_in_sec
+        self.backoff_in_sec = 0.0
+        self.next_attempt_at = 0.0
+        self.last_success_at = None
+
+    def prepare(self, config: dict) -> None:
+        self.interval_in_sec = float(config.get("interval_in_sec", self.interval_in_sec))
+        self.failure_threshold = max(1, int(config.get("failure_threshold", self.failure_threshold)))
+        self.backoff_base_in_sec = float(config.get("backoff_base_in_sec", self.backoff_base_in_sec))
+        self.backoff_cap_in_sec = float(config.get("backoff_cap_in_sec", self.backoff_cap_in_sec))
+        self.timeout_lower_limit_in_sec = float(config.get("timeout_lower_limit_in_sec", self.timeout_lower_limit_in_sec))
+        self.timeout_upper_limit_in_sec = float(config.get("timeout_upper_limit_in_sec", self.timeout_upper_limit_in_sec))
+        self.timeout_in_sec = self.timeout_lower_limit_in_sec
+
+    def allow_request(self) -> bool:
+        if self.clock() < self.next_attempt_at:
+            return False
+        if self.state == STATE_OPEN:
+            self._set_state(STATE_HALF_OPEN)
+        return True
+
+    def get_delay_in_sec(self) -> float:
+        return max(0.0, self.next_attempt_at - self.clock())
+
+    def record_success(self) -> None:
+        self.total_successes += 1
+        self.consecutive_failures = 0
+        self.backoff_in_sec = 0.0
+        self.timeout_in_sec = self.timeout_lower_limit_in_sec
+        self.last_success_at = self.clock()
+        self.next_attempt_at = self.last_success_at + self.interval_in_sec
+        if self.state != STATE_CLOSED:
+            self._set_state(STATE_CLOSED)
+
+    def record_timeout(self) -> None:
+        self.timeout_in_sec = min(self.timeout_in_sec * 2, self.timeout_upper_limit_in_sec)
+        self.record_failure()
+
+    def record_failure(self) -> None:
+        self.total_failures += 1
+        self.consecutive_failures += 1
+        # Decorrelated jitter: sleep = min(cap, random_between(base, sleep * 3)).
+        previous_backoff_in_sec = max(self.backoff_in_sec, self.backoff_base_in_sec)
+        self.backoff_in_sec = min(
+            self.backoff_cap_in_sec,
+            self.rng.uniform(self.backoff_base_in_sec, previous_backoff_in_sec * 3),
+        )
+        self.next_attempt_at = self.clock() + self.backoff_in_sec
+        if self.state == STATE_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != STATE_OPEN:
+                self._set_state(STATE_OPEN)
+
+    def get_snapshot(self) -> dict:
+        return {
+            "board_id": self.board_id,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "total_failures": self.total_failures,
+            "total_successes": self.total_successes,
+            "timeout_in_sec": self.timeout_in_sec,
+            "delay_in_sec": self.get_delay_in_sec(),
+        }
+
+    def _set_state(self, state: str) -> None:
+        logger.info(f"[BoardHealthTracker] Board ID ({self.board_id}): {self.state} -> {state}")
+        self.state = state
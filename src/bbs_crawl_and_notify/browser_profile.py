@@ -0,0 +1,69 @@
+from loguru import logger
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+
+
+class BrowserProfile:
+    """
+    Chrome settings for Selenium fetches. We only read HTML, so the lean profile (the default)
+    runs headless, stops at DOMContentLoaded and does not load images, media, fonts or third-party hosts.
+    Set `lean: false` to get the default headed Chrome.
+    """
+
+    const_blocked_url_patterns_for_media = [
+        "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.svg", "*.ico",
+        "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+        "*.woff", "*.woff2", "*.ttf", "*.otf",
+    ]
+
+    def __init__(self):
+        self.lean = True
+        self.headless = True
+        self.page_load_strategy = "eager"
+        self.block_images = True
+        self.block_media = True
+        self.allowed_hosts = ["fmkorea.com"]
+        self.disk_cache_size_in_bytes = 16 * 1024 * 1024
+        self.readiness_timeout_in_sec = 4.0
+
+    def prepare(self, config: dict) -> None:
+        self.lean = bool(config.get("lean", self.lean))
+        self.headless = bool(config.get("headless", self.headless))
+        self.page_load_strategy = config.get("page_load_strategy", self.page_load_strategy)
+        self.block_images = bool(config.get("block_images", self.block_images))
+        self.block_media = bool(config.get("block_media", self.block_media))
+        self.allowed_hosts = list(config.get("allowed_hosts", self.allowed_hosts))
+        self.disk_cache_size_in_bytes = int(config.get("disk_cache_size_in_bytes", self.disk_cache_size_in_bytes))
+        self.readiness_timeout_in_sec = float(config.get("readiness_timeout_in_sec", self.readiness_timeout_in_sec))
+
+    def create_chrome_options(self) -> ChromeOptions:
+        options = ChromeOptions()
+        if not self.lean:
+            return options
+        if self.headless:
+            options.add_argument("--headless=new")
+        options.page_load_strategy = self.page_load_strategy
+        options.add_argument(f"--disk-cache-size={self.disk_cache_size_in_bytes}")
+        options.add_argument("--disable-extensions")
+        options.add_argument("--mute-audio")
+        options.add_argument("--autoplay-policy=user-gesture-required")
+        if self.allowed_hosts:
+            # Hosts other than the allowed ones fail to resolve, which blocks ads, trackers and other third parties.
+            exclusions = ", ".join(f"EXCLUDE {host}, EXCLUDE *.{host}" for host in self.allowed_hosts)
+            options.add_argument(f"--host-resolver-rules=MAP * ~NOTFOUND, {exclusions}")
+        if self.block_images:
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        return options
+
+    def apply(self, driver: Chrome) -> None:
+        """
+        Applies settings which need a running driver.
+        """
+        if not (self.lean and self.block_media):
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.const_blocked_url_patterns_for_media})
+        except Exception as e:
+            logger.warning(f"Failed to block media requests: {e}")
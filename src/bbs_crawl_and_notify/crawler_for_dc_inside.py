@@ -1,12 +1,17 @@
 import asyncio
+import collections
 import concurrent.futures
 import queue
-from threading import Thread
+import time
 
 import dc_api
 from loguru import logger
 
+from bbs_crawl_and_notify.board_health_tracker import BoardHealthTracker
 from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.host_rate_limiter import apply_rate_limiter
+from bbs_crawl_and_notify.post import Batch, Post, SOURCE_DC_INSIDE
+from bbs_crawl_and_notify.worker_supervisor import start_worker
 
 
 class _AsyncTimedIterator:
@@ -36,108 +41,386 @@ class AsyncTimedIterable:
         return self._factory()
 
 
-def run_coroutine_to_fetch(q: queue.Queue, board_id: str, max_of_id: int, global_control_context: dict) -> None:
+class DocumentBodyCache:
+    """
+    A size-bounded LRU cache of document bodies, keyed by (board ID, document ID).
+    A value is a tuple of (snippet, image URLs).
+    It is only used on the asyncio loop thread, so it has no lock.
+    """
+
+    __slots__ = ("_entries", "_max_size")
+
+    def __init__(self, max_size: int):
+        self._entries = collections.OrderedDict()
+        self._max_size = max_size
+
+    def get(self, key: tuple) -> tuple | None:
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: tuple, value: tuple) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DCInsideFetchOptions:
+    """
+    Options for `fetch()`, read from `crawler.dc_inside.config` in the global config.
+
+    `catch_up_max_depth` is the number of list pages to read concurrently when more posts than
+    `num` arrived since the last poll. `catch_up_window` is the number of posts to read from each
+    of those pages; keep it larger than a page so that the windows overlap rather than leave holes.
+    `list_timeout_in_sec` is how long to wait for each index of a list.
+
+    The body fetch stage is opt-in (`body_fetch.enabled`). See `fetch_bodies()`.
+    """
+
+    __slots__ = (
+        "catch_up_enabled", "catch_up_max_depth", "catch_up_window", "list_timeout_in_sec", "api_factory",
+        "body_fetch_enabled", "body_fetch_concurrency", "body_fetch_timeout_in_sec",
+        "body_fetch_deadline_in_sec", "body_max_length", "body_cache", "body_semaphore",
+    )
+
+    def __init__(self):
+        self.api_factory = None  # `dc_api.API` if `None`. It's replaced in record and replay modes.
+        self.catch_up_enabled = True
+        self.catch_up_max_depth = 4
+        self.catch_up_window = 32
+        self.list_timeout_in_sec = 8.0
+        self.body_fetch_enabled = False
+        self.body_fetch_concurrency = 4
+        self.body_fetch_timeout_in_sec = 3.0
+        self.body_fetch_deadline_in_sec = 5.0
+        self.body_max_length = 200
+        self.body_cache = DocumentBodyCache(1024)
+        self.body_semaphore = None  # It's created on the asyncio loop by `fetch_bodies()`. It's shared by all boards.
+
+    def prepare(self, config: dict) -> None:
+        catch_up_config = config.get("catch_up", {})
+        self.catch_up_enabled = bool(catch_up_config.get("enabled", self.catch_up_enabled))
+        self.catch_up_max_depth = max(1, int(catch_up_config.get("max_depth", self.catch_up_max_depth)))
+        self.catch_up_window = max(1, int(catch_up_config.get("window", self.catch_up_window)))
+        self.list_timeout_in_sec = float(config.get("list_timeout_in_sec", self.list_timeout_in_sec))
+
+        body_fetch_config = config.get("body_fetch", {})
+        self.body_fetch_enabled = bool(body_fetch_config.get("enabled", self.body_fetch_enabled))
+        self.body_fetch_concurrency = max(1, int(body_fetch_config.get("concurrency", self.body_fetch_concurrency)))
+        self.body_fetch_timeout_in_sec = float(body_fetch_config.get("timeout_in_sec", self.body_fetch_timeout_in_sec))
+        self.body_fetch_deadline_in_sec = float(body_fetch_config.get("deadline_in_sec", self.body_fetch_deadline_in_sec))
+        self.body_max_length = int(body_fetch_config.get("max_length", self.body_max_length))
+        self.body_cache = DocumentBodyCache(max(1, int(body_fetch_config.get("cache_size", 1024))))
+
+
+def run_coroutine_to_fetch(q: queue.Queue, board_id: str, max_of_id: int, global_control_context: dict, fetch_options: DCInsideFetchOptions | None = None, health_tracker: BoardHealthTracker | None = None, heartbeat=None) -> None:
     """
     Runs the coroutine to fetch data in a separate thread.
     Checks for the exit_event to terminate gracefully.
 
+    |health_tracker| decides the timeout and when to fetch next. See `BoardHealthTracker`.
+    |heartbeat| is called on every iteration. See `WorkerSupervisor`. The thread returns when it returns `False`.
     """
     logger.info(f"[async component] Starting coroutine... with max_of_id({max_of_id})")
-    const_timeout_upper_limit_in_sec = 64
-    const_timeout_lower_limit_in_sec = 8
-    timeout_in_sec = const_timeout_lower_limit_in_sec
+    if health_tracker is None:
+        health_tracker = BoardHealthTracker(board_id)
+    exit_event = global_control_context["exit_event"]
     try:
-        while not global_control_context["exit_event"].is_set():
+        while not exit_event.is_set():
+            if heartbeat is not None and not heartbeat():
+                logger.info(f"[async component] Worker for Board ID ({board_id}) was replaced. Exiting loop.")
+                return
+            if not health_tracker.allow_request():
+                exit_event.wait(health_tracker.get_delay_in_sec())
+                continue
             future = asyncio.run_coroutine_threadsafe(
-                fetch(board_id, max_of_id, global_control_context),
+                fetch(board_id, max_of_id, global_control_context, fetch_options, health_tracker.timeout_in_sec),
                 global_control_context["asyncio_loop"]
             )
             try:
-                logger.info(f"[async component] Timeout: ({timeout_in_sec}) seonds")
-                result_from_call = future.result(timeout=timeout_in_sec)
-                logger.info(f"[async component] Received: {result_from_call}")
-                max_of_id = result_from_call["max_of_id"]
+                logger.debug("[async component] Timeout: ({}) seconds", health_tracker.timeout_in_sec)
+                result_from_call = future.result(timeout=health_tracker.timeout_in_sec)
+                if heartbeat is not None and not heartbeat():
+                    # A new generation took over while this fetch was blocked. It reads from the same `max_of_id`.
+                    logger.info(f"[async component] Worker for Board ID ({board_id}) was replaced. Dropping its result.")
+                    return
+                health_tracker.record_success()
+                max_of_id = result_from_call.max_of_id
                 q.put(result_from_call)
-                logger.info(f"[async component] Result from fetch: {result_from_call}")
-                logger.info(f"[async component] Updated max_of_id: {max_of_id}")
-
-                const_time_to_sleep_between_req_in_sec = 15
-                logger.info(f"[async component] Sleeping before next fetch for {const_time_to_sleep_between_req_in_sec} seconds...")
-                for _ in range(const_time_to_sleep_between_req_in_sec):
-                    if global_control_context["exit_event"].is_set():
-                        logger.info("[async component] Exit event is set. Exiting loop.")
-                        return
-                    global_control_context["exit_event"].wait(1)
+                logger.debug("[async component] Result from fetch: {}", result_from_call)
+                logger.debug("[async component] Updated max_of_id: {}", max_of_id)
             except concurrent.futures.TimeoutError:
-                logger.info("[async component] Timeout while waiting for fetch result; retrying immediately")
-                timeout_in_sec = timeout_in_sec * 2
-                if timeout_in_sec > const_timeout_upper_limit_in_sec:
-                    timeout_in_sec = const_timeout_upper_limit_in_sec
+                logger.info("[async component] Timeout while waiting for fetch result")
+                future.cancel()
+                health_tracker.record_timeout()
+            except Exception as e:
+                logger.warning(f"[async component] Fetch failed for Board ID ({board_id}): {e}")
+                health_tracker.record_failure()
+            logger.debug("[async component] Sleeping before next fetch for {:.1f} seconds...", health_tracker.get_delay_in_sec())
+            exit_event.wait(health_tracker.get_delay_in_sec())
+        logger.info("[async component] Exit event is set. Exiting loop.")
     except Exception as e:
+        # The thread exits. `WorkerSupervisor` restarts it from the last `max_of_id`.
         logger.error(f"[async component] Exception in coroutine: {e}")
-        q.put(None)  # Signal failure
     finally:
         logger.info("[async component] Exiting coroutine thread.")
 
 
-async def fetch(board_id: str, max_of_id: int, global_control_context: dict) -> dict:
+def open_indexes(api: dc_api.API, board_id: str, start_page: int, num: int, max_of_id: int, timeout_in_sec: float | None) -> _AsyncTimedIterator:
+    """
+    Opens an iterator over up to |num| document indexes starting at |start_page|, newest first.
+    It stops early once it reaches |max_of_id| (the watermark) or the end of the board.
+    `dc_api` requests the next page only when the current one is used up, so an open iterator
+    can be read further later without reading its first page again.
+    Each index is waited for up to |timeout_in_sec|, or without a limit if it's `None`.
+    """
+    if max_of_id != 0:
+        index_generator = api.board(
+            board_id,
+            start_page=start_page,
+            num=num,
+            document_id_lower_limit=max_of_id,
+        )
+    else:
+        index_generator = api.board(
+            board_id, start_page=start_page, num=num
+        )
+    timed_index_generator = AsyncTimedIterable(
+        iterable=index_generator, timeout=timeout_in_sec
+    )
+    return timed_index_generator.__aiter__()
+
+
+async def take_indexes(index_iterator: _AsyncTimedIterator, num: int) -> tuple[list, bool]:
+    """
+    Reads up to |num| more indexes from |index_iterator|.
+    It returns the indexes and whether the read timed out. Indexes after a timeout are unknown,
+    so a timed out read must not be taken as reaching the watermark.
+    """
+    indexes = []
+    while len(indexes) < num:
+        try:
+            index = await index_iterator.__anext__()
+        except StopAsyncIteration:
+            break
+        if index is None:
+            return (indexes, True)
+        indexes.append(index)
+    return (indexes, False)
+
+
+async def collect_indexes(api: dc_api.API, board_id: str, start_page: int, num: int, max_of_id: int, timeout_in_sec: float | None) -> tuple[list, bool]:
+    """
+    Collects up to |num| document indexes starting at |start_page|. See `open_indexes()` and `take_indexes()`.
+    """
+    return await take_indexes(open_indexes(api, board_id, start_page, num, max_of_id, timeout_in_sec), num)
+
+
+async def catch_up(api: dc_api.API, board_id: str, max_of_id: int, fetch_options: DCInsideFetchOptions, timeout_in_sec: float | None, first_page_iterator: _AsyncTimedIterator, first_page_indexes: list) -> list:
+    """
+    Reads list pages 1..`catch_up_max_depth` concurrently, each up to the watermark.
+    Page 1 was already read by `fetch()`, so its window is |first_page_iterator| read further,
+    and only pages 2.. are requested anew.
+
+    A window which failed or timed out leaves a hole below it. Only the windows from the watermark
+    up to the first hole are returned, so `max_of_id` never moves past posts that were not read.
+    The posts above the hole are read again in the next poll.
+    Duplicates across pages are expected. The caller merges them by ID.
+    """
+    window = fetch_options.catch_up_window
+    pages = range(1, fetch_options.catch_up_max_depth + 1)
+    results = await asyncio.gather(
+        take_indexes(first_page_iterator, window - len(first_page_indexes)),
+        *(collect_indexes(api, board_id, page, window, max_of_id, timeout_in_sec) for page in pages[1:]),
+        return_exceptions=True,
+    )
+    windows = []  # (indexes, is_complete) per page
+    for page, result in zip(pages, results):
+        if isinstance(result, BaseException):
+            logger.warning(f"_[catch_up] Failed to read page ({page}) of Board ID ({board_id}): {result}")
+            windows.append(([], False))
+            continue
+        (page_indexes, timed_out) = result
+        if timed_out:
+            logger.warning(f"_[catch_up] Timed out reading page ({page}) of Board ID ({board_id}).")
+        windows.append((page_indexes, not timed_out))
+    (first_page_window, is_complete) = windows[0]
+    windows[0] = (first_page_indexes + first_page_window, is_complete)
+
+    # A short window means that the generator stopped at the watermark or at the end of the board.
+    bottom = next((i for i, (page_indexes, is_complete) in enumerate(windows) if is_complete and len(page_indexes) < window), None)
+    if bottom is None:
+        if all(is_complete for (_, is_complete) in windows):
+            logger.warning(f"_[catch_up] Catch-up for Board ID ({board_id}) stopped at depth ({fetch_options.catch_up_max_depth}) before reaching max_of_id({max_of_id}). Some posts may be missed.")
+            return [index for (page_indexes, _) in windows for index in page_indexes]
+        logger.warning(f"_[catch_up] Catch-up for Board ID ({board_id}) did not reach max_of_id({max_of_id}). It will be retried in the next poll.")
+        return []
+    top = bottom
+    while top > 0 and windows[top - 1][1]:
+        top -= 1
+    if top > 0:
+        logger.warning(f"_[catch_up] Page ({top}) of Board ID ({board_id}) was not read in full. Posts above it will be read in the next poll.")
+    return [index for (page_indexes, _) in windows[top:bottom + 1] for index in page_indexes]
+
+
+def merge_indexes_by_id(indexes: list) -> list:
+    """
+    Removes duplicated indexes and sorts them by ID, newest first, as the board lists them.
+    """
+    merged = {}
+    for index in indexes:
+        merged[int(index.id)] = index
+    return [merged[document_id] for document_id in sorted(merged, reverse=True)]
+
+
+async def fetch_body(api: dc_api.API, post: Post, fetch_options: DCInsideFetchOptions) -> None:
+    """
+    Sets a snippet of the document body to |post|'s `text`, and its image URLs to `media_urls`.
+    Failures and timeouts leave them empty.
+    """
+    key = (post.board_id, post.post_id)
+    cached = fetch_options.body_cache.get(key)
+    if cached is None:
+        try:
+            async with fetch_options.body_semaphore:
+                document = await asyncio.wait_for(
+                    api.document(post.board_id, str(post.post_id)), fetch_options.body_fetch_timeout_in_sec
+                )
+        except Exception as e:
+            logger.debug("_[fetch_body] Failed to fetch the body of ({}): {!r}", key, e)
+            return
+        contents = document.contents if document is not None and document.contents else ""
+        snippet = " ".join(contents.split())[:fetch_options.body_max_length]
+        image_urls = [image.src for image in document.images if image.src] if document is not None else []
+        cached = (snippet, image_urls)
+        fetch_options.body_cache.put(key, cached)
+    (snippet, image_urls) = cached
+    post.text = snippet or None
+    post.media_urls = list(image_urls)
+
+
+async def fetch_bodies(api: dc_api.API, posts: list, fetch_options: DCInsideFetchOptions, deadline_in_sec: float | None = None) -> None:
+    """
+    Fetches bodies of |posts| concurrently, bounded by a semaphore shared by all boards.
+    Each body has its own timeout, and the whole stage stops at |deadline_in_sec|
+    (`body_fetch_deadline_in_sec` if `None`). Posts whose bodies are late keep only their titles.
+    """
+    if not posts:
+        return
+    if fetch_options.body_semaphore is None:
+        fetch_options.body_semaphore = asyncio.Semaphore(fetch_options.body_fetch_concurrency)
+    tasks = [asyncio.ensure_future(fetch_body(api, post, fetch_options)) for post in posts]
+    if deadline_in_sec is None:
+        deadline_in_sec = fetch_options.body_fetch_deadline_in_sec
+    (_, pending) = await asyncio.wait(tasks, timeout=deadline_in_sec)
+    if pending:
+        logger.info(f"_[fetch_bodies] ({len(pending)}) bodies are late. Sending their titles only.")
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def create_post_from_index(board_id: str, index: dc_api.DocumentIndex) -> Post:
+    return Post(
+        SOURCE_DC_INSIDE,
+        board_id,
+        index.title,
+        post_id=int(index.id),
+        author=index.author,
+        time=index.time,
+        category=index.subject,
+        url=f"https://m.dcinside.com/board/{board_id}/{index.id}",
+    )
+
+
+async def fetch(board_id: str, max_of_id: int, global_control_context: dict, fetch_options: DCInsideFetchOptions | None = None, timeout_in_sec: float | None = None) -> Batch:
     """
     Fetches data from the DCInside API asynchronously.
+
+    It reads one post more than it sends in a normal poll. When that post is still newer than |max_of_id|,
+    more posts arrived than one fetch can hold. In that case it pages backwards (see `catch_up()`).
+
+    |timeout_in_sec| is how long the caller waits for the result. The body stage ends early enough
+    to return the titles within it, so late bodies never cost the titles.
+
+    Every HTTP request of the API, one per list page or body, takes a token from
+    `global_control_context["host_rate_limiter"]` if it is set, so all boards share one budget for the host.
     """
-    const_time_in_sec = 8
     const_num_first_fetch = 16
     const_num_normal_fetch = 16
+    const_time_to_return_in_sec = 1  # Time left for closing the API and handing the result back.
 
-    api = dc_api.API()
-    logger.info("_[fetch] Trying to fetch board messages...")
-    logger.info(f"_[fetch] Board ID: {board_id}")
-    logger.info(f"_[fetch]Max of ID: {max_of_id}")
+    started_at = asyncio.get_running_loop().time()
+    if fetch_options is None:
+        fetch_options = DCInsideFetchOptions()
+
+    rate_limiter = global_control_context.get("host_rate_limiter")
+    api = fetch_options.api_factory() if fetch_options.api_factory else dc_api.API()
+    list_timeout_in_sec = fetch_options.list_timeout_in_sec
+    if apply_rate_limiter(api, rate_limiter, fetch_options.list_timeout_in_sec):
+        # A timeout per index would count the wait for a token, so each request times out on its own instead.
+        list_timeout_in_sec = None
+    logger.debug("_[fetch] Trying to fetch board messages... Board ID: {} Max of ID: {}", board_id, max_of_id)
 
     try:
-        index_generator = None
-        if max_of_id != 0:
-            index_generator = api.board(
-                board_id,
-                start_page=1,
-                num=const_num_normal_fetch,
-                document_id_lower_limit=max_of_id,
-            )
-        else:
-            index_generator = api.board(
-                board_id, start_page=1, num=const_num_first_fetch
-            )
-        logger.info("_[fetch] Done!")
-        message = ""
-        cnt = 0
-        timed_index_generator = AsyncTimedIterable(
-            iterable=index_generator, timeout=const_time_in_sec
+        num = const_num_normal_fetch if max_of_id != 0 else const_num_first_fetch
+        can_catch_up = fetch_options.catch_up_enabled and max_of_id != 0
+        # The iterator is opened for a whole catch-up window, but only read further if there is a gap.
+        first_page_iterator = open_indexes(
+            api, board_id, 1, max(num + 1, fetch_options.catch_up_window) if can_catch_up else num, max_of_id, list_timeout_in_sec
+        )
+        (indexes, timed_out) = await take_indexes(first_page_iterator, num + 1 if can_catch_up else num)
+        if timed_out and max_of_id != 0:
+            # Posts between the last one read and |max_of_id| are unknown. Sending the ones read would move past them.
+            raise asyncio.TimeoutError(f"Timed out reading the list of Board ID ({board_id}) after ({len(indexes)}) posts.")
+        logger.debug("_[fetch] Done!")
+
+        # Exactly |num| new posts is not a gap. The extra post tells it apart.
+        has_gap = (
+            can_catch_up
+            and len(indexes) > num
+            and min(int(index.id) for index in indexes) > max_of_id
         )
-        async for index in timed_index_generator:
-            if index:
-                if int(index.id) > max_of_id:
-                    max_of_id = int(index.id)
-                message += index.title + "\n"
-                cnt += 1
-        logger.info(message)
+        if has_gap:
+            logger.info(f"_[fetch] Gap detected for Board ID ({board_id}). Catching up to max_of_id({max_of_id})...")
+            indexes = merge_indexes_by_id(await catch_up(api, board_id, max_of_id, fetch_options, list_timeout_in_sec, first_page_iterator, indexes))
+
+        posts = []
+        for index in indexes:
+            if int(index.id) > max_of_id:
+                max_of_id = int(index.id)
+            posts.append(create_post_from_index(board_id, index))
+
+        if fetch_options.body_fetch_enabled:
+            deadline_in_sec = fetch_options.body_fetch_deadline_in_sec
+            if timeout_in_sec is not None:
+                elapsed_in_sec = asyncio.get_running_loop().time() - started_at
+                deadline_in_sec = min(deadline_in_sec, timeout_in_sec - elapsed_in_sec - const_time_to_return_in_sec)
+            if deadline_in_sec > 0:
+                await fetch_bodies(api, posts, fetch_options, deadline_in_sec)
+            else:
+                logger.info(f"_[fetch] No time left for bodies of Board ID ({board_id}). Sending titles only.")
 
         await api.close()
 
-        result_to_return = {}
-        result_to_return["board_id"] = board_id
-        result_to_return["message"] = board_id + '\n' + message
-        result_to_return["max_of_id"] = max_of_id
-
-        logger.info(result_to_return)
+        result_to_return = Batch(SOURCE_DC_INSIDE, board_id, posts, max_of_id)
+        logger.debug("_[fetch] {}", result_to_return)
         return result_to_return
 
     except asyncio.CancelledError:
         logger.info("Fetch coroutine was cancelled.")
         await api.close()
-        return {"message": "", "max_of_id": max_of_id, "board_id": board_id}
+        return Batch(SOURCE_DC_INSIDE, board_id, max_of_id=max_of_id)
     except Exception as e:
+        # Let the caller see the failure, so that `BoardHealthTracker` can back off.
         logger.error(f"Exception in fetch coroutine: {e}")
         await api.close()
-        return {"message": "", "max_of_id": max_of_id, "board_id": board_id}
+        raise
 
 
 class CrawlerForDCInside:
@@ -145,15 +428,27 @@ class CrawlerForDCInside:
     def __init__(self):
         self.visited_item_recorder = None
         self.boards = None
+        self.fetch_options = DCInsideFetchOptions()
+        self.circuit_breaker_config = {}
+        self.health_trackers = {}
         self.max_of_id_dict = {}
         self.child_threads = []
+        self.supervisor = None  # Optional. `WorkerSupervisor` restarts dead or stalled board workers.
         self.controller_message_queue = None  # This is a shared object. The lifecycle of this queue is managed by the parent.
 
 
     def prepare(self, global_config: GlobalConfigIR) -> None:
         self.boards = global_config.config["crawler"]["dc_inside"]["config"]["boards"]
+        self.fetch_options.prepare(global_config.config["crawler"]["dc_inside"]["config"])
+        self.circuit_breaker_config = global_config.config["crawler"]["dc_inside"]["config"].get("circuit_breaker", {})
         logger.info(self.boards)
 
+    def get_board_health(self) -> dict:
+        """
+        Returns a snapshot of `BoardHealthTracker` for each board, for monitoring.
+        """
+        return {board_id: tracker.get_snapshot() for board_id, tracker in self.health_trackers.items()}
+
     def set_controller_message_queue(self, controller_message_queue: queue.Queue) -> None:
         self.controller_message_queue = controller_message_queue
 
@@ -162,48 +457,60 @@ class CrawlerForDCInside:
         Starts the crawler for DCInside.
         This method creates threads to fetch data from the DCInside API.
         It uses a queue to communicate results back to the main thread.
-        """
 
-        def run_loop(global_control_context: dict) -> None:
-
-            logger.info("Starting CrawlerForDCInside...")
+        With `supervisor`, a restarted board worker resumes from its board's `max_of_id_dict` entry,
+        and `get_board_health()` is included in the supervisor's periodic report.
+        """
 
-            q = queue.Queue()  # Thread-safe queue for results
+        logger.info("Starting CrawlerForDCInside...")
 
-            for board in self.boards:
-                board_id = board["id"]
-                if board_id == "":
-                    logger.warning("Board ID is empty. Continue...")
-                    continue
-                self.max_of_id_dict[board_id] = 0
+        q = queue.Queue()  # Thread-safe queue for results. It outlives restarted threads.
 
-                t = Thread(target=run_coroutine_to_fetch, name=f"CrawlerForDCInside::...({board_id})", args=(q, board_id, self.max_of_id_dict[board_id], global_control_context,), daemon=True)
-                self.child_threads.append(t)
-                logger.info(f"Starting DCInside crawler thread for Board ID({board_id})...")
-                t.start()
+        def run_board_worker(heartbeat, board_id: str) -> None:
+            run_coroutine_to_fetch(q, board_id, self.max_of_id_dict[board_id], global_control_context, self.fetch_options, self.health_trackers[board_id], heartbeat)
 
+        def run_loop(heartbeat) -> None:
             logger.info("_[CrawlerForDCInside][start][run_loop] Now looping...")
             # Wait for result from thread or exit event
             while not global_control_context["exit_event"].is_set():
+                if not heartbeat():
+                    return
                 try:
                     result = q.get(timeout=1)  # Check periodically
-                    logger.info(result)
-                    if result is not None and result["message"] != result["board_id"] + '\n':
-                        logger.info(f"CrawlerForDCInside received: {result}")
-                        board_id = result["board_id"]
-                        max_of_id = result["max_of_id"]
+                    if result is not None and len(result.posts) > 0:
+                        logger.info("CrawlerForDCInside received: {}", result)
+                        board_id = result.board_id
+                        max_of_id = result.max_of_id
                         if board_id not in self.max_of_id_dict:
                             logger.warning(f"Board ID {board_id} not found in max_of_id_dict.")
                             continue
                         self.max_of_id_dict[board_id] = max_of_id
-                        logger.info(f"Updated max_of_id_dict: {self.max_of_id_dict}")
+                        logger.debug("Updated max_of_id_dict: {}", self.max_of_id_dict)
                         self.controller_message_queue.put(result)
                 except queue.Empty:
                     continue  # Keep waiting if no result yet
 
             logger.info("_[CrawlerForDCInside][start][run_loop] Exit event set. Exiting...")
-            for t in self.child_threads:
-                t.join(timeout=1)
+            # Child threads are joined by `ShutdownCoordinator` against the global deadline.
+
+        for board in self.boards:
+            board_id = board["id"]
+            if board_id == "":
+                logger.warning("Board ID is empty. Continue...")
+                continue
+            self.max_of_id_dict[board_id] = 0
+            health_tracker = BoardHealthTracker(board_id, clock=global_control_context.get("clock", time.monotonic))
+            health_tracker.prepare(self.circuit_breaker_config)
+            self.health_trackers[board_id] = health_tracker
+
+            logger.info(f"Starting DCInside crawler thread for Board ID({board_id})...")
+            t = start_worker(
+                self.supervisor,
+                f"CrawlerForDCInside::...({board_id})",
+                lambda heartbeat, board_id=board_id: run_board_worker(heartbeat, board_id),
+            )
+            self.child_threads.append(t)
 
-        t = Thread(target=run_loop, name="CrawlerForDCInside::start::run_loop", args=(global_control_context,))
-        t.start()
+        start_worker(self.supervisor, "CrawlerForDCInside::start::run_loop", run_loop)
+        if self.supervisor is not None:
+            self.supervisor.add_report_source("dc_inside_board_health", self.get_board_health)
@@ -12,9 +12,15 @@ from bs4 import BeautifulSoup
 from loguru import logger
 from selenium import webdriver
 from selenium.webdriver.chrome.webdriver import WebDriver as Chrome
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions
+from selenium.webdriver.support.ui import WebDriverWait
 import selenium
 
+from bbs_crawl_and_notify.browser_profile import BrowserProfile
 from bbs_crawl_and_notify.link_visitor_client_context import LinkVisitorClientContext
+from bbs_crawl_and_notify.list_page_change_detector import ListPageChangeDetector
+from bbs_crawl_and_notify.post import Batch, Post, SOURCE_FM_KOREA
 
 
 def visit_page(driver: Chrome, url: str) -> None:
@@ -26,12 +32,16 @@ def visit_page(driver: Chrome, url: str) -> None:
         sys.exit(-1)
 
 
-def create_client_context_with_selenium() -> LinkVisitorClientContext:
-    driver = webdriver.Chrome()
+def create_client_context_with_selenium(browser_profile: BrowserProfile | None = None) -> LinkVisitorClientContext:
+    if browser_profile is None:
+        browser_profile = BrowserProfile()
+    driver = webdriver.Chrome(options=browser_profile.create_chrome_options())
+    browser_profile.apply(driver)
     driver.implicitly_wait(0.5)
 
     client_context = LinkVisitorClientContext()
     client_context.driver = driver
+    client_context.browser_profile = browser_profile
     return client_context
 
 
@@ -39,6 +49,36 @@ def visit_with_selenium(client_context: LinkVisitorClientContext, url: str) -> N
     visit_page(client_context.driver, url)
 
 
+def wait_until_ready(global_control_context: dict, client_context: LinkVisitorClientContext, css_selector: str) -> None:
+    """
+    With the lean profile, it waits until |css_selector| is present, up to `readiness_timeout_in_sec`.
+    Otherwise, it waits for a fixed time as before.
+    """
+    const_time_to_sleep_after_visit_using_selenium = 2
+
+    browser_profile = client_context.browser_profile
+    if browser_profile is None or not browser_profile.lean:
+        global_control_context["exit_event"].wait(const_time_to_sleep_after_visit_using_selenium)
+        return
+    try:
+        WebDriverWait(client_context.driver, browser_profile.readiness_timeout_in_sec).until(
+            expected_conditions.presence_of_element_located((By.CSS_SELECTOR, css_selector))
+        )
+    except selenium.common.exceptions.TimeoutException:
+        logger.warning(f"Timed out waiting for ({css_selector}). Continue anyway.")
+
+
+def acquire_request_budget(global_control_context: dict, url: str) -> bool:
+    """
+    Waits for the shared per-host budget (`HostRateLimiter`) if it is configured.
+    Returns `False` if the exit event is set while waiting.
+    """
+    rate_limiter = global_control_context.get("host_rate_limiter")
+    if rate_limiter is None:
+        return True
+    return rate_limiter.acquire(url, global_control_context["exit_event"])
+
+
 def remove_video_tag_message(text: str) -> str:
     return text.replace("Video 태그를 지원하지 않는 브라우저입니다.", "")
 
@@ -61,19 +101,18 @@ def print_message(message: str):
         sys.stdout.buffer.flush()
 
 
-def escape_text(text: str) -> str:
-    # const_regex_to_escape = r"(?<!\\)(_|\*|\[|\]|\(|\)|\~|`|>|#|\+|-|=|\||\{|\}|\.|\!)"
-    const_regex_to_escape = r"(?<!\\)(_|\*|\[|\]|\(|\)|\~|`|>|#|\+|=|\||\{|\})"
-    text = re.sub(const_regex_to_escape, lambda t: "\\" + t.group(), text)
-    return text
-
-
 class CrawlerForFMKorea:
     def __init__(self):
         self.visited_item_recorder = None
+        # These are replaced in record and replay modes. See `record_and_replay`.
+        self.http_get = requests.get
+        self.client_context_factory = create_client_context_with_selenium
+        self.list_page_change_detector = ListPageChangeDetector()
+        self.browser_profile = BrowserProfile()
 
     def prepare(self, global_config: dict) -> None:
-        pass
+        local_config = global_config.config.get("crawler", {}).get("fm_korea", {}).get("config", {})
+        self.browser_profile.prepare(local_config.get("browser", {}))
 
     def visit_article_link(
         self,
@@ -84,26 +123,30 @@ class CrawlerForFMKorea:
 
         if href:
             if self.visited_item_recorder.is_visited(href):
-                logger.info(f"Already visited: ({href}). Skip it.")
+                logger.debug("Already visited: ({}). Skip it.", href)
                 flag_continue = True
             else:
                 self.visited_item_recorder.add_item(href)
                 url_for_href = f"https://www.fmkorea.com{href}"
-                const_time_to_sleep_after_visit_using_selenium = 2
                 const_time_to_sleep_between_req_for_href_in_sec = 1
                 const_timeout_for_requests_get_in_sec = 16
 
                 try:
+                    if not acquire_request_budget(global_control_context, url_for_href):
+                        return (flag_continue, text)
                     visit_with_selenium(client_context, url_for_href)
-                    global_control_context["exit_event"].wait(
-                        const_time_to_sleep_after_visit_using_selenium
-                    )
-                    req_for_href = requests.get(
+                    wait_until_ready(global_control_context, client_context, "div.xe_content")
+                    if not acquire_request_budget(global_control_context, url_for_href):
+                        return (flag_continue, text)
+                    req_for_href = self.http_get(
                         url_for_href, timeout=const_timeout_for_requests_get_in_sec
                     )
-                    global_control_context["exit_event"].wait(
-                        const_time_to_sleep_between_req_for_href_in_sec
-                    )
+                    # When the host has a budget, the limiter paces requests instead of a fixed sleep.
+                    rate_limiter = global_control_context.get("host_rate_limiter")
+                    if rate_limiter is None or not rate_limiter.has_budget(url_for_href):
+                        global_control_context["exit_event"].wait(
+                            const_time_to_sleep_between_req_for_href_in_sec
+                        )
                     soup_for_href = BeautifulSoup(
                         req_for_href.content, "html.parser", from_encoding="cp949"
                     )
@@ -118,22 +161,31 @@ class CrawlerForFMKorea:
 
         return (flag_continue, text)
 
-    def get_message_to_send(self, global_control_context: dict) -> str:
-        logger.info("+[CrawlerForFMKorea::get_message_to_send] ")
-        const_time_to_sleep_after_visit_using_selenium = 2
+    def get_message_to_send(self, global_control_context: dict) -> Batch:
+        logger.debug("+[CrawlerForFMKorea::get_message_to_send] ")
+        const_board_id = "football_world"
         const_timeout_for_requests_get_in_sec = 16
 
-        to_return = ""
+        to_return = Batch(SOURCE_FM_KOREA, const_board_id)
         page_number = 1
-        url = f"https://www.fmkorea.com/index.php?mid=football_world&page={page_number}"
-        client_context = create_client_context_with_selenium()
+        url = f"https://www.fmkorea.com/index.php?mid={const_board_id}&page={page_number}"
+        # Check the list page first. When it has not changed, there is nothing new to send,
+        # so we skip the browser, parsing and article visits.
+        if not acquire_request_budget(global_control_context, url):
+            return to_return
+        req = self.list_page_change_detector.get(url, const_timeout_for_requests_get_in_sec)
+        if not self.list_page_change_detector.has_changed(url, req):
+            logger.info("The list page has not changed. Skip it.")
+            return to_return
+        if not acquire_request_budget(global_control_context, url):
+            return to_return
+        client_context = self.client_context_factory(self.browser_profile)
         visit_with_selenium(client_context, url)
-        global_control_context["exit_event"].wait(const_time_to_sleep_after_visit_using_selenium)
-        req = requests.get(url, timeout=const_timeout_for_requests_get_in_sec)
+        wait_until_ready(global_control_context, client_context, "td.title.hotdeal_var8")
         soup = BeautifulSoup(req.content, "html.parser", from_encoding="cp949")
         td_tags = soup.find_all("td", "title hotdeal_var8")
 
-        logger.info(f"Number of tags: ({len(td_tags)})")
+        logger.debug("Number of tags: ({})", len(td_tags))
 
         const_max_td_tags = 20
         # Use the smaller of the configured maximum and the actual number of tags
@@ -153,6 +205,7 @@ class CrawlerForFMKorea:
             # Let's look for a |title| and |text|.
             title = ""
             text = ""
+            href = None
             if td_tag is not None:
                 a_tags = td_tag.find_all("a")
                 first_a_tag = a_tags[0]
@@ -166,17 +219,17 @@ class CrawlerForFMKorea:
                     if continue_flag:
                         continue
 
-            # Let's pseudo-escape |title| and |text| to send them using an HTTP GET call.
-            # Escaping is not perfect now.
-            # TODO(pastry-personal5): Fix escaping. Also, fix the style of a telegram message.
-            title = escape_text(title)
-            if text:
-                text = escape_text(text)
-                logger.info(f"- [{category}]{title} ({text})")
-                to_return = f"{to_return}- \\[{category}]{title} ({text})\n"
-            else:
-                logger.info(f"- [{category}]{title}")
-                to_return = f"{to_return}- \\[{category}]{title}\n"
+            logger.debug("- [{}]{}", category, title)
+            to_return.posts.append(Post(
+                SOURCE_FM_KOREA,
+                const_board_id,
+                title,
+                category=category,
+                text=text if text else None,
+                url=f"https://www.fmkorea.com{href}" if href else None,
+            ))
 
         client_context.clean_up()
+        # The page has been processed. From now on, the same page is "unchanged".
+        self.list_page_change_detector.commit(url)
         return to_return
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+import urllib.parse
+
+import aiohttp
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket. `reserve()` takes tokens right away, even into debt,
+    and returns how long the caller has to wait. So callers are served in the order they arrive.
+    """
+
+    __slots__ = ("rate_per_sec", "capacity", "tokens", "updated_at", "lock")
+
+    def __init__(self, rate_per_sec: float, capacity: float, now: float):
+        self.rate_per_sec = rate_per_sec
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: float, now: float) -> float:
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_sec)
+            self.updated_at = now
+            self.tokens -= tokens
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate_per_sec
+
+    def refund(self, tokens: float) -> None:
+        with self.lock:
+            self.tokens = min(self.capacity, self.tokens + tokens)
+
+
+class HostRateLimiter:
+    """
+    A process-wide request budget per host, shared by threads and asyncio coroutines.
+    It's put in `global_control_context["host_rate_limiter"]`.
+
+    e.g.
+    rate_limit:
+      default:  # Optional. Hosts without a budget are not limited.
+        requests_per_sec: 1
+        burst: 4
+      hosts:
+        m.dcinside.com:
+          requests_per_sec: 2
+          burst: 8
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.speedup = 1.0  # It's set in replay mode, for `acquire_async()`. `exit_event` accelerates `acquire()`.
+        self.default_config = None
+        self.host_configs = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def prepare(self, global_config: GlobalConfigIR) -> None:
+        local_config = global_config.config.get("rate_limit", {})
+        self.default_config = local_config.get("default")
+        self.host_configs = local_config.get("hosts", {})
+
+    @staticmethod
+    def get_host(url_or_host: str) -> str:
+        if "://" in url_or_host:
+            return urllib.parse.urlsplit(url_or_host).hostname or url_or_host
+        return url_or_host
+
+    def reserve(self, url_or_host: str, tokens: float = 1) -> float:
+        """
+        Takes |tokens| from the bucket of the host and returns the time to wait in seconds.
+        """
+        bucket = self._get_bucket(self.get_host(url_or_host))
+        if bucket is None:
+            return 0.0
+        return bucket.reserve(tokens, self.clock())
+
+    def has_budget(self, url_or_host: str) -> bool:
+        """
+        Returns whether the host has a configured budget, i.e. whether requests to it are paced at all.
+        """
+        return self._get_bucket(self.get_host(url_or_host)) is not None
+
+    def refund(self, url_or_host: str, tokens: float = 1) -> None:
+        """
+        Gives back |tokens| which were reserved for a request that was never made.
+        """
+        bucket = self._get_bucket(self.get_host(url_or_host))
+        if bucket is not None:
+            bucket.refund(tokens)
+
+    def acquire(self, url_or_host: str, exit_event=None, tokens: float = 1) -> bool:
+        """
+        Blocks until the request is allowed. Returns `False` if |exit_event| is set while waiting.
+        """
+        wait_in_sec = self.reserve(url_or_host, tokens)
+        if wait_in_sec <= 0:
+            return True
+        if exit_event is not None:
+            if exit_event.wait(wait_in_sec):
+                self.refund(url_or_host, tokens)
+                return False
+            return True
+        time.sleep(wait_in_sec)
+        return True
+
+    async def acquire_async(self, url_or_host: str, tokens: float = 1) -> None:
+        """
+        Waits until the request is allowed. If the caller is cancelled while waiting, the tokens are given back,
+        so cancelled requests do not delay the ones after them.
+        """
+        wait_in_sec = self.reserve(url_or_host, tokens)
+        if wait_in_sec <= 0:
+            return
+        try:
+            await asyncio.sleep(wait_in_sec / self.speedup)
+        except asyncio.CancelledError:
+            self.refund(url_or_host, tokens)
+            raise
+
+    def _get_bucket(self, host: str) -> TokenBucket | None:
+        with self.lock:
+            if host in self.buckets:
+                return self.buckets[host]
+            config = self.host_configs.get(host, self.default_config)
+            bucket = None
+            if config:
+                rate_per_sec = float(config["requests_per_sec"])
+                bucket = TokenBucket(rate_per_sec, float(config.get("burst", max(1.0, rate_per_sec))), self.clock())
+            self.buckets[host] = bucket
+            return bucket
+
+
+class _RateLimitedRequest:
+
+    __slots__ = ("_rate_limiter", "_url", "_request_factory", "_request")
+
+    def __init__(self, rate_limiter: HostRateLimiter, url: str, request_factory):
+        self._rate_limiter = rate_limiter
+        self._url = url
+        self._request_factory = request_factory
+        self._request = None
+
+    async def __aenter__(self):
+        await self._rate_limiter.acquire_async(self._url)
+        self._request = self._request_factory()
+        return await self._request.__aenter__()
+
+    async def __aexit__(self, *args):
+        return await self._request.__aexit__(*args)
+
+
+class RateLimitedSession:
+    """
+    It wraps an `aiohttp.ClientSession`. Each `get()` takes a token for its host right before the request.
+    `dc_api.API` reads list pages with one `get()` each, so a read across several pages is charged per page.
+
+    The wait for a token can be long when many boards share the host. So a timeout around `get()`
+    would count the wait as a slow response. |request_timeout_in_sec| is applied to the request itself instead,
+    after the token is taken.
+    """
+
+    def __init__(self, session, rate_limiter: HostRateLimiter, request_timeout_in_sec: float | None = None):
+        self._session = session
+        self._rate_limiter = rate_limiter
+        self._request_timeout_in_sec = request_timeout_in_sec
+
+    def get(self, url: str, **kwargs) -> _RateLimitedRequest:
+        if self._request_timeout_in_sec is not None:
+            kwargs.setdefault("timeout", aiohttp.ClientTimeout(total=self._request_timeout_in_sec))
+        return _RateLimitedRequest(self._rate_limiter, url, lambda: self._session.get(url, **kwargs))
+
+    def __getattr__(self, name: str):
+        return getattr(self._session, name)
+
+
+def apply_rate_limiter(api, rate_limiter: HostRateLimiter | None, request_timeout_in_sec: float | None = None) -> bool:
+    """
+    Makes every HTTP request of |api| take from |rate_limiter|. APIs without a `session` (e.g. replay) are left as they are.
+    Returns whether it was applied. If so, time out each request with |request_timeout_in_sec| rather than around it.
+    See `RateLimitedSession`.
+    """
+    session = getattr(api, "session", None)
+    if rate_limiter is None or session is None:
+        return False
+    api.session = RateLimitedSession(session, rate_limiter, request_timeout_in_sec)
+    return True
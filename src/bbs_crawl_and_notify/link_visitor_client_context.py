@@ -1,8 +1,10 @@
 class LinkVisitorClientContext:
     driver = None  # It's a Selenium driver.
+    browser_profile = None  # It's a `BrowserProfile` used to create |driver|.
 
     def __init__(self):
         self.driver = None
+        self.browser_profile = None
 
     def clean_up(self):
         if self.driver:
@@ -0,0 +1,68 @@
+import hashlib
+import re
+
+import requests
+
+
+class ListPageChangeDetector:
+    """
+    It tells whether a list page has changed since the last visit.
+
+    It prefers `ETag`/`Last-Modified` conditional requests. When the server does not support them
+    or answers with a full body anyway, it hashes the article links in the list table.
+    View counts and ads change on every request, so the whole body is not hashed.
+
+    `has_changed()` only compares. Validators and the digest are kept when `commit()` is called,
+    after the page has been processed, so a page which failed halfway is seen as changed again.
+    """
+
+    const_regex_for_article_link = re.compile(
+        rb'<td class="title hotdeal_var8"[^>]*>.*?<a[^>]*?href="([^"]+)"', re.DOTALL
+    )
+
+    def __init__(self):
+        self.http_get = requests.get  # It's replaced in record and replay modes.
+        self.etag_dict = {}
+        self.last_modified_dict = {}
+        self.digest_dict = {}
+        self.pending_dict = {}  # url -> (ETag, Last-Modified, digest) of the last response, until `commit()`.
+
+    def get_conditional_headers(self, url: str) -> dict:
+        headers = {}
+        if url in self.etag_dict:
+            headers["If-None-Match"] = self.etag_dict[url]
+        if url in self.last_modified_dict:
+            headers["If-Modified-Since"] = self.last_modified_dict[url]
+        return headers
+
+    def get(self, url: str, timeout: float) -> requests.Response:
+        return self.http_get(url, headers=self.get_conditional_headers(url), timeout=timeout)
+
+    def has_changed(self, url: str, response: requests.Response) -> bool:
+        """
+        Returns whether |url| has changed since the last `commit()`.
+        A page without any recognizable article link is always treated as changed.
+        """
+        if response.status_code == 304:
+            return False
+
+        links = self.const_regex_for_article_link.findall(response.content)
+        digest = hashlib.blake2b(b"\n".join(links), digest_size=16).digest() if links else None
+        self.pending_dict[url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"), digest)
+        return digest is None or self.digest_dict.get(url) != digest
+
+    def commit(self, url: str) -> None:
+        """
+        Keeps validators and the digest from the last `has_changed()` call for |url|.
+        """
+        if url not in self.pending_dict:
+            return
+        (etag, last_modified, digest) = self.pending_dict.pop(url)
+        if etag:
+            self.etag_dict[url] = etag
+        if last_modified:
+            self.last_modified_dict[url] = last_modified
+        if digest is None:
+            self.digest_dict.pop(url, None)
+        else:
+            self.digest_dict[url] = digest
@@ -0,0 +1,67 @@
+"""
+This module configures loguru from the `logging` section of the global config.
+
+e.g.
+logging:
+  level: "INFO"
+  enqueue: true  # Write from a background thread, so the crawl threads never wait on I/O.
+  serialize: false  # Write one JSON record per line.
+  max_message_length: 512  # Longer messages are truncated.
+  components:
+    crawler_for_dc_inside: "WARNING"
+    crawler_for_fm_korea: "OFF"
+
+Hot paths log with `{}` arguments instead of f-strings, so a disabled level costs no formatting.
+"""
+
+import sys
+
+from loguru import logger
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+
+
+const_package_name = "bbs_crawl_and_notify"
+const_compact_format = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <7} | {name}:{line} | {message}"
+
+
+def create_truncating_patcher(max_message_length: int):
+    def patch_record(record: dict) -> None:
+        message = record["message"]
+        if len(message) > max_message_length:
+            record["message"] = f"{message[:max_message_length]}...(+{len(message) - max_message_length} chars)"
+
+    return patch_record
+
+
+def configure_logging(global_config: GlobalConfigIR, sink=sys.stderr) -> None:
+    local_config = global_config.config.get("logging")
+    if local_config is None:
+        return
+
+    level = local_config.get("level", "INFO")
+    components = local_config.get("components", {})
+
+    level_per_module = {"": level}
+    for component, component_level in components.items():
+        module_name = f"{const_package_name}.{component}"
+        if component_level == "OFF":
+            # A disabled module returns before a record is even created.
+            logger.disable(module_name)
+            continue
+        logger.enable(module_name)
+        level_per_module[module_name] = component_level
+
+    logger.remove()
+    logger.configure(patcher=create_truncating_patcher(int(local_config.get("max_message_length", 512))))
+    logger.add(
+        sink,
+        # Records below the lowest configured level are dropped before formatting.
+        level=min((logger.level(module_level).no for module_level in level_per_module.values())),
+        filter=level_per_module,
+        format=const_compact_format,
+        enqueue=bool(local_config.get("enqueue", True)),
+        serialize=bool(local_config.get("serialize", False)),
+        backtrace=False,
+        diagnose=False,
+    )
@@ -9,45 +9,44 @@ from abc import ABC, abstractmethod
 import asyncio
 import datetime
 import queue
+import os
 import signal
 import sys
-import threading
+import time
 from threading import Event, Thread
 
 from loguru import logger
 
+from bbs_crawl_and_notify.archive_sink_for_jsonl import ArchiveSinkForJsonl
 from bbs_crawl_and_notify.notifier_for_telegram import NotifierForTelegram
 from bbs_crawl_and_notify.crawler_for_fm_korea import CrawlerForFMKorea
 from bbs_crawl_and_notify.crawler_for_dc_inside import CrawlerForDCInside
 from bbs_crawl_and_notify.visited_item_recorder import VisitedItemRecorder
 from bbs_crawl_and_notify.global_config_controller import GlobalConfigController, GlobalConfigIR
+from bbs_crawl_and_notify.host_rate_limiter import HostRateLimiter
+from bbs_crawl_and_notify.logging_controller import configure_logging
+from bbs_crawl_and_notify.media_pipeline import MediaPipeline
+from bbs_crawl_and_notify.record_and_replay import (
+    AcceleratedEvent,
+    IOPlayer,
+    IORecorder,
+    MODE_RECORD,
+    MODE_REPLAY,
+    NotifierForReplay,
+    create_client_context_for_replay,
+)
+from bbs_crawl_and_notify.shutdown_coordinator import ShutdownCoordinator
+from bbs_crawl_and_notify.worker_supervisor import WorkerSupervisor, start_worker
 
 
 def quit_application(signo, _frame, global_control_context: dict):
-    # `_frame` and `context` are not used. It's intentional.
+    # `_frame` is not used. It's intentional.
+    # The handler only sets `exit_event`. The main thread wakes up and runs `ShutdownCoordinator`.
+    if global_control_context["exit_event"].is_set():
+        logger.warning(f"Interrupted again by signal number {signo}. Exiting immediately.")
+        os._exit(-1)
     logger.info(f"Interrupted by signal number {signo}, shutting down...")
-    logger.info(_frame)
-    logger.info(global_control_context)
-    logger.info(global_control_context["exit_event"])
-
     global_control_context["exit_event"].set()
-    logger.info("Exit event is set. Exiting application.")
-
-    # Stop the asyncio event loop
-    if "asyncio_loop" in global_control_context:
-        loop = global_control_context["asyncio_loop"]
-        loop.call_soon_threadsafe(loop.stop)
-
-    logger.info("Waiting for threads to finish...")
-
-    # Allow threads to finish gracefully
-    for thread in threading.enumerate():
-        if thread is not threading.current_thread():
-            logger.info(f"Joining thread: {thread.name}")
-            thread.join(timeout=5)  # Wait for threads to finish (optional timeout)
-
-    logger.info("Exiting application.")
-    sys.exit(0)
 
 
 class ChildControllerBase(ABC):
@@ -55,6 +54,9 @@ class ChildControllerBase(ABC):
         self.crawler = None
         self.visited_item_recorder = None
         self.notifier = None
+        self.archiver = None  # Optional. This is a shared object. The lifecycle of this object is managed by the parent.
+        self.media_pipeline = None  # Optional. This is a shared object, too.
+        self.supervisor = None  # Optional. `WorkerSupervisor` restarts the loop if it dies or stalls.
 
     @abstractmethod
     def prepare(self, global_config: GlobalConfigIR) -> None:
@@ -75,25 +77,29 @@ class ChildControllerForBlockingIO(ChildControllerBase):
         self.notifier.prepare(global_config)
 
     def start(self, global_control_context: dict) -> None:
-        def run_loop_with_context(context: dict):
+        def run_loop_with_context(heartbeat, context: dict):
             const_time_to_sleep_between_req = 15
-            max_count = 12 * 60
-            for _ in range(max_count):
-                logger.info("_[blocking io component] Trying to fetch content...")
-                message_to_send = self.crawler.get_message_to_send(context)
-                if len(message_to_send) > 0:
-                    self.notifier.notify(message_to_send)
-                logger.info(datetime.datetime.now())
-                logger.info("Now sleep...")
+            while heartbeat():
+                logger.debug("_[blocking io component] Trying to fetch content...")
+                batch_to_send = self.crawler.get_message_to_send(context)
+                if len(batch_to_send.posts) > 0:
+                    self.notifier.notify(batch_to_send)
+                    if self.media_pipeline:
+                        self.media_pipeline.process(batch_to_send, self.notifier)
+                    if self.archiver:
+                        self.archiver.archive(batch_to_send)
+                logger.opt(lazy=True).debug("Now sleep... {}", datetime.datetime.now)
                 for _ in range(const_time_to_sleep_between_req):
                     if context["exit_event"].is_set():
                         logger.info("Exit event is set. Exiting loop.")
                         return
                     context["exit_event"].wait(1)
-                logger.info(datetime.datetime.now())
 
-        t = Thread(target = run_loop_with_context, args = (global_control_context,))
-        t.start()
+        start_worker(
+            self.supervisor,
+            "ChildControllerForBlockingIO::run_loop",
+            lambda heartbeat: run_loop_with_context(heartbeat, global_control_context),
+        )
 
 
 class ChildControllerForAsyncIO(ChildControllerBase):
@@ -111,37 +117,41 @@ class ChildControllerForAsyncIO(ChildControllerBase):
 
         logger.info("Starting ChildControllerForAsyncIO...")
 
-        def run_loop_with_context(context: dict, q: queue.Queue):
+        self.crawler.supervisor = self.supervisor
+        self.crawler.start(global_control_context)
+
+        def run_loop_with_context(heartbeat, context: dict, q: queue.Queue):
 
             logger.info("Starting run_loop_with_context...")
 
             const_time_to_sleep_between_req = 15
-            max_count = 12 * 60
 
-            self.crawler.start(context)
-
-            for _ in range(max_count):
-                logger.info("_[async io component] Trying to fetch content...")
+            while heartbeat():
+                logger.debug("_[async io component] Trying to fetch content...")
                 while not q.empty():
-                    result = q.get()
-                    message = result["message"]
-                    if len(message) > 0:
-                        logger.info(f"Processing message: {message}")
-                        # Process the message here
-                        # For example, you can call the notifier to send the message
-                        self.notifier.notify(message)
-
-                logger.info(datetime.datetime.now())
-                logger.info("Now sleep...")
+                    batch = q.get()
+                    if len(batch.posts) > 0:
+                        logger.info("Processing batch: {}", batch)
+                        # Process the batch here
+                        # For example, you can call the notifier to send the batch
+                        self.notifier.notify(batch)
+                        if self.media_pipeline:
+                            self.media_pipeline.process(batch, self.notifier)
+                        if self.archiver:
+                            self.archiver.archive(batch)
+
+                logger.opt(lazy=True).debug("Now sleep... {}", datetime.datetime.now)
                 for _ in range(const_time_to_sleep_between_req):
                     if context["exit_event"].is_set():
                         logger.info("Exit event is set. Exiting loop.")
                         return
                     context["exit_event"].wait(1)
-                logger.info(datetime.datetime.now())
 
-        t = Thread(target = run_loop_with_context, args = (global_control_context, self.controller_message_queue,))
-        t.start()
+        start_worker(
+            self.supervisor,
+            "ChildControllerForAsyncIO::run_loop",
+            lambda heartbeat: run_loop_with_context(heartbeat, global_control_context, self.controller_message_queue),
+        )
 
 
 class MainController:
@@ -150,6 +160,10 @@ class MainController:
         self.global_config_controller = GlobalConfigController()
         self.global_config = None
         self.child_controllers = None
+        self.archiver = None
+        self.media_pipeline = None
+        self.shutdown_coordinator = ShutdownCoordinator()
+        self.supervisor = None
 
         self.loop = None
         self.loop_thread = None
@@ -157,21 +171,33 @@ class MainController:
     def do_main_loop(self) -> None:
         logger.info("Starting MainController...")
         global_config = self.global_config
+        self.shutdown_coordinator.prepare(global_config)
+        self.archiver = self._build_archiver(global_config)
+        self.media_pipeline = self._build_media_pipeline(global_config)
         self.child_controllers = self._build_child_controllers(global_config)
 
         global_control_context = {}
+        global_control_context["shutdown_coordinator"] = self.shutdown_coordinator
         self._init_signal_functions(global_control_context)
         self._init_asyncio_loop(global_control_context)
+        self._init_record_and_replay(global_control_context)
+        self._init_host_rate_limiter(global_control_context)
+        self._init_supervisor(global_control_context)
+        if self.archiver:
+            self.archiver.start(global_control_context)
+            self.shutdown_coordinator.register_callback("archiver", self.archiver.stop)
+        if self.media_pipeline:
+            self.media_pipeline.start(global_control_context)
         self._start_child_controllers(global_control_context)
+        self.supervisor.start(global_control_context)
 
         # Keep the main thread alive to process signals
         while not global_control_context["exit_event"].is_set():
             global_control_context["exit_event"].wait(1)
 
         # Stop.
-        if self.loop:
-            self.loop.call_soon_threadsafe(self.loop.stop)
-            self.loop_thread.join()
+        self.shutdown_coordinator.shutdown(global_control_context)
+        logger.info("Exiting application.")
 
     def _start_child_controllers(self, global_control_context: dict) -> None:
         for controller in self.child_controllers:
@@ -187,6 +213,7 @@ class MainController:
         if not global_config_controller.validate(self.global_config):
             logger.error("Global config validation failed.")
             sys.exit(-1)
+        configure_logging(self.global_config)
 
     def _init_signal_functions(self, global_control_context: dict) -> None:
         """
@@ -215,6 +242,91 @@ class MainController:
 
         global_control_context["asyncio_loop"] = self.loop
 
+    def _init_record_and_replay(self, global_control_context: dict) -> None:
+        """
+        This function sets up record or replay mode if `record_and_replay` is configured.
+        See `record_and_replay` for details.
+        In replay mode, it replaces `global_control_context`'s "exit_event" and sets "clock".
+        """
+        local_config = self.global_config.config.get("record_and_replay")
+        if not local_config:
+            return
+        mode = local_config["mode"]
+        path = local_config["path"]
+        if mode == MODE_RECORD:
+            logger.info(f"Recording crawler I/O to {path}...")
+            recorder = IORecorder(path)
+            self.shutdown_coordinator.register_callback("recorder", recorder.close)
+            for controller in self.child_controllers:
+                crawler = controller.crawler
+                if isinstance(crawler, CrawlerForFMKorea):
+                    crawler.http_get = recorder.wrap_http_get(crawler.http_get)
+                    crawler.list_page_change_detector.http_get = recorder.wrap_http_get(crawler.list_page_change_detector.http_get)
+                elif isinstance(crawler, CrawlerForDCInside):
+                    crawler.fetch_options.api_factory = recorder.create_api_factory()
+        elif mode == MODE_REPLAY:
+            speedup = float(local_config.get("speedup", 60))
+            logger.info(f"Replaying crawler I/O from {path} at ({speedup})x...")
+            player = IOPlayer(path)
+            exit_event = AcceleratedEvent(speedup)
+            global_control_context["exit_event"] = exit_event
+            global_control_context["clock"] = exit_event.monotonic
+            for controller in self.child_controllers:
+                crawler = controller.crawler
+                controller.notifier = NotifierForReplay()
+                controller.media_pipeline = None
+                if isinstance(crawler, CrawlerForFMKorea):
+                    crawler.http_get = player.http_get
+                    crawler.list_page_change_detector.http_get = player.http_get
+                    crawler.client_context_factory = create_client_context_for_replay
+                elif isinstance(crawler, CrawlerForDCInside):
+                    crawler.fetch_options.api_factory = player.create_api_factory()
+        else:
+            logger.error(f"Unknown record_and_replay mode: {mode}")
+            sys.exit(-1)
+
+    def _init_host_rate_limiter(self, global_control_context: dict) -> None:
+        """
+        This function creates the process-wide `HostRateLimiter` shared by all crawlers.
+        It sets `global_control_context`'s "host_rate_limiter".
+        It follows the replay clock and `speedup` in replay mode.
+        """
+        rate_limiter = HostRateLimiter(clock=global_control_context.get("clock", time.monotonic))
+        rate_limiter.speedup = getattr(global_control_context["exit_event"], "speedup", 1.0)
+        rate_limiter.prepare(self.global_config)
+        global_control_context["host_rate_limiter"] = rate_limiter
+
+    def _init_supervisor(self, global_control_context: dict) -> None:
+        """
+        This function creates the `WorkerSupervisor` for board workers and controller loops.
+        It sets `global_control_context`'s "worker_supervisor", so liveness and board health can be read with `get_report()`.
+        """
+        self.supervisor = WorkerSupervisor(clock=global_control_context.get("clock", time.monotonic))
+        self.supervisor.prepare(self.global_config)
+        for controller in self.child_controllers:
+            controller.supervisor = self.supervisor
+        global_control_context["worker_supervisor"] = self.supervisor
+
+    def _build_archiver(self, global_config: GlobalConfigIR) -> ArchiveSinkForJsonl | None:
+        """
+        This function builds the archiver if `archive.jsonl` is configured.
+        """
+        if "jsonl" not in global_config.config.get("archive", {}):
+            return None
+        archiver = ArchiveSinkForJsonl()
+        archiver.prepare(global_config)
+        return archiver
+
+    def _build_media_pipeline(self, global_config: GlobalConfigIR) -> MediaPipeline | None:
+        """
+        This function builds the media pipeline if `media` is configured.
+        """
+        if "media" not in global_config.config:
+            return None
+        media_pipeline = MediaPipeline()
+        media_pipeline.prepare(global_config)
+        return media_pipeline
+
     def _build_child_controllers(self, global_config: GlobalConfigIR) -> list:
         """
         This function builds controllers based on the global config.
@@ -231,6 +343,8 @@ class MainController:
             notifier_for_telegram = NotifierForTelegram()
             notifier_for_telegram.prepare(global_config)
             child_controller_for_fm_korea.notifier = notifier_for_telegram
+            child_controller_for_fm_korea.archiver = self.archiver
+            child_controller_for_fm_korea.media_pipeline = self.media_pipeline
             controllers.append(child_controller_for_fm_korea)
 
         if True:
@@ -241,6 +355,8 @@ class MainController:
             notifier_for_telegram = NotifierForTelegram()
             notifier_for_telegram.prepare(global_config)
             child_controller_for_dc_inside.notifier = notifier_for_telegram
+            child_controller_for_dc_inside.archiver = self.archiver
+            child_controller_for_dc_inside.media_pipeline = self.media_pipeline
             controllers.append(child_controller_for_dc_inside)
 
         return controllers
@@ -0,0 +1,290 @@
+"""
+This module sends images attached to posts, after the text message of a batch.
+
+- Downloads are streamed to a file in chunks and stop at `max_file_size_in_bytes`, so memory stays flat.
+- The type is sniffed with `filetype` from the first bytes. Anything but a photo type is dropped early.
+- Files are stored by their SHA-256 in a bounded on-disk cache. A URL seen before is never downloaded again,
+  and an image which has already been sent is never uploaded again, even from another URL.
+- Images are sent with `sendPhoto`, or `sendMediaGroup` for up to `media_group_size` images at once.
+  A group is also cut at `max_group_size_in_bytes`, because the upload holds the whole group in memory.
+- All of it runs on one worker thread. `process()` only queues a batch, so controllers never wait for media.
+
+DC Inside image URLs come from the body fetch stage (`crawler.dc_inside.config.body_fetch`).
+"""
+
+import hashlib
+import collections
+import json
+import os
+import queue
+import tempfile
+from threading import Thread
+
+import filetype
+import requests
+from loguru import logger
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.post import Batch
+
+
+const_index_file_name = "index.json"
+const_num_bytes_to_sniff = 8192
+const_photo_mime_types = ("image/jpeg", "image/png", "image/webp")
+
+
+class MediaCache:
+    """
+    Files are named `<sha256>.<extension>`. The least recently used files are removed
+    when the total size exceeds |max_size_in_bytes|.
+    The directory is scanned once. After that, files are tracked in memory in LRU order.
+    `index.json` keeps URL -> hash and the hashes already sent, bounded by |max_index_entries|.
+    """
+
+    def __init__(self, directory: str, max_size_in_bytes: int, max_index_entries: int = 16384):
+        self.directory = directory
+        self.max_size_in_bytes = max_size_in_bytes
+        self.max_index_entries = max_index_entries
+        self.hash_per_url = {}
+        self.sent_hashes = {}  # It's used as an ordered set, so the oldest entries are trimmed first.
+        self.files = collections.OrderedDict()  # digest -> (path, size), least recently used first.
+        self.total_size_in_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+        index_path = os.path.join(directory, const_index_file_name)
+        if os.path.exists(index_path):
+            try:
+                with open(index_path, "r", encoding="utf-8") as index_file:
+                    index = json.load(index_file)
+                self.hash_per_url = index.get("hash_per_url", {})
+                self.sent_hashes = dict.fromkeys(index.get("sent_hashes", []), True)
+            except (OSError, ValueError) as e:
+                logger.warning(f"[MediaCache] Failed to read {index_path}: {e}. Starting empty.")
+
+    def get_hash_for_url(self, url: str) -> str | None:
+        return self.hash_per_url.get(url)
+
+    def set_hash_for_url(self, url: str, digest: str) -> None:
+        self.hash_per_url[url] = digest
+        self._trim(self.hash_per_url)
+
+    def is_sent(self, digest: str) -> bool:
+        return digest in self.sent_hashes
+
+    def mark_sent(self, digest: str) -> None:
+        self.sent_hashes[digest] = True
+        self._trim(self.sent_hashes)
+
+    def get_path(self, digest: str) -> str | None:
+        if digest not in self.files:
+            return None
+        self.files.move_to_end(digest)
+        (path, _) = self.files[digest]
+        os.utime(path)  # Keep the LRU order across restarts.
+        return path
+
+    def get_size(self, digest: str) -> int:
+        return self.files[digest][1] if digest in self.files else 0
+
+    def add_file(self, temp_path: str, digest: str, extension: str) -> str:
+        if digest in self.files:
+            os.remove(temp_path)
+            self.files.move_to_end(digest)
+            return self.files[digest][0]
+        path = os.path.join(self.directory, f"{digest}.{extension}")
+        os.replace(temp_path, path)
+        size = os.path.getsize(path)
+        self.files[digest] = (path, size)
+        self.total_size_in_bytes += size
+        self._evict()
+        return path
+
+    def save(self) -> None:
+        index_path = os.path.join(self.directory, const_index_file_name)
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            json.dump({"hash_per_url": self.hash_per_url, "sent_hashes": list(self.sent_hashes)}, index_file)
+        os.replace(temp_path, index_path)
+
+    def _trim(self, entries: dict) -> None:
+        while len(entries) > self.max_index_entries:
+            del entries[next(iter(entries))]
+
+    def _scan(self) -> None:
+        files = []
+        for name in os.listdir(self.directory):
+            if name == const_index_file_name or name.endswith((".part", ".tmp")):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name.split(".")[0], path, stat.st_size))
+        for (_, digest, path, size) in sorted(files):
+            self.files[digest] = (path, size)
+            self.total_size_in_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self.total_size_in_bytes > self.max_size_in_bytes and self.files:
+            (_, (path, size)) = self.files.popitem(last=False)
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"[MediaCache] Failed to remove {path}: {e}")
+            self.total_size_in_bytes -= size
+
+
+class MediaPipeline:
+
+    def __init__(self):
+        self.cache = None
+        self.max_file_size_in_bytes = 10 * 1024 * 1024  # The limit of Telegram for photos.
+        self.max_media_per_post = 4
+        self.media_group_size = 10  # The limit of Telegram for `sendMediaGroup`.
+        self.max_group_size_in_bytes = 20 * 1024 * 1024
+        self.timeout_in_sec = 16
+        self.chunk_size_in_bytes = 64 * 1024
+        self.batch_queue = queue.Queue(maxsize=64)  # It's shared by controllers.
+        self.worker_thread = None
+
+    def prepare(self, global_config: GlobalConfigIR) -> None:
+        local_config = global_config.config["media"]["config"]
+        self.max_file_size_in_bytes = int(local_config.get("max_file_size_in_bytes", self.max_file_size_in_bytes))
+        self.max_media_per_post = int(local_config.get("max_media_per_post", self.max_media_per_post))
+        self.media_group_size = min(10, max(2, int(local_config.get("media_group_size", self.media_group_size))))
+        self.max_group_size_in_bytes = int(local_config.get("max_group_size_in_bytes", self.max_group_size_in_bytes))
+        self.timeout_in_sec = float(local_config.get("timeout_in_sec", self.timeout_in_sec))
+        self.cache = MediaCache(
+            local_config["cache_directory"],
+            int(local_config.get("max_cache_size_in_bytes", 256 * 1024 * 1024)),
+        )
+
+    def start(self, global_control_context: dict) -> None:
+        self.worker_thread = Thread(target=self._run_loop, name="MediaPipeline::worker", args=(global_control_context,), daemon=True)
+        self.worker_thread.start()
+
+    def process(self, batch: Batch, notifier) -> None:
+        """
+        Queues |batch| for the worker thread. It never blocks. When the queue is full, the media of |batch| is dropped.
+        """
+        if not any(post.media_urls for post in batch.posts):
+            return
+        try:
+            self.batch_queue.put_nowait((batch, notifier))
+        except queue.Full:
+            logger.warning("[MediaPipeline] The queue is full. Dropping the media of {}", batch)
+
+    def process_now(self, batch: Batch, notifier) -> None:
+        """
+        Downloads new images of |batch| and sends the ones which have not been sent yet.
+        """
+        digests = []
+        for post in batch.posts:
+            for url in post.media_urls[:self.max_media_per_post]:
+                digest = self.cache.get_hash_for_url(url)
+                if digest is None:
+                    digest = self.download(url, referer=post.url)
+                if not digest or digest in digests or self.cache.is_sent(digest):
+                    continue
+                digests.append(digest)
+
+        for group in self._split_into_groups(digests):
+            photos = []
+            for digest in group:
+                path = self.cache.get_path(digest)
+                if path is not None:
+                    photos.append((digest, path))
+            if not photos:
+                continue
+            file_ids = notifier.send_photos([path for (_, path) in photos])
+            for ((digest, _), file_id) in zip(photos, file_ids):
+                if file_id:
+                    self.cache.mark_sent(digest)
+        self.cache.save()
+
+    def _split_into_groups(self, digests: list) -> list:
+        groups = []
+        group = []
+        group_size_in_bytes = 0
+        for digest in digests:
+            size = self.cache.get_size(digest)
+            if group and (len(group) >= self.media_group_size or group_size_in_bytes + size > self.max_group_size_in_bytes):
+                groups.append(group)
+                group = []
+                group_size_in_bytes = 0
+            group.append(digest)
+            group_size_in_bytes += size
+        if group:
+            groups.append(group)
+        return groups
+
+    def _run_loop(self, global_control_context: dict) -> None:
+        exit_event = global_control_context["exit_event"]
+        while not exit_event.is_set():
+            try:
+                (batch, notifier) = self.batch_queue.get(timeout=1)
+            except queue.Empty:
+                continue
+            try:
+                self.process_now(batch, notifier)
+            except Exception as e:
+                logger.error(f"[MediaPipeline] Failed to process media of {batch}: {e}")
+        logger.info("[MediaPipeline] Worker thread exited.")
+
+    def download(self, url: str, referer: str | None = None) -> str | None:
+        """
+        Streams |url| into the cache. Returns the SHA-256 of the content, or `None` if it failed or was rejected.
+        A rejected URL is remembered with an empty hash, so it is not downloaded again.
+        """
+        headers = {"Referer": referer} if referer else {}
+        temp_path = None
+        try:
+            with requests.get(url, headers=headers, stream=True, timeout=self.timeout_in_sec) as response:
+                if response.status_code != 200:
+                    logger.debug("[MediaPipeline] ({}) for {}", response.status_code, url)
+                    return None
+                content_length = int(response.headers.get("Content-Length") or 0)
+                if content_length > self.max_file_size_in_bytes:
+                    logger.info(f"[MediaPipeline] Too large ({content_length} bytes): {url}")
+                    self.cache.set_hash_for_url(url, "")
+                    return None
+
+                hasher = hashlib.sha256()
+                head = b""
+                kind = None
+                size = 0
+                with tempfile.NamedTemporaryFile(dir=self.cache.directory, suffix=".part", delete=False) as temp_file:
+                    temp_path = temp_file.name
+                    for chunk in response.iter_content(self.chunk_size_in_bytes):
+                        size += len(chunk)
+                        if size > self.max_file_size_in_bytes:
+                            logger.info(f"[MediaPipeline] Too large (over {self.max_file_size_in_bytes} bytes): {url}")
+                            self.cache.set_hash_for_url(url, "")
+                            return None
+                        if kind is None and len(head) < const_num_bytes_to_sniff:
+                            head += chunk[:const_num_bytes_to_sniff - len(head)]
+                            if len(head) >= const_num_bytes_to_sniff:
+                                kind = filetype.guess(head)
+                                if kind is None or kind.mime not in const_photo_mime_types:
+                                    logger.debug("[MediaPipeline] Not a photo: {}", url)
+                                    self.cache.set_hash_for_url(url, "")
+                                    return None
+                        hasher.update(chunk)
+                        temp_file.write(chunk)
+                if kind is None:
+                    kind = filetype.guess(head) if head else None
+                    if kind is None or kind.mime not in const_photo_mime_types:
+                        logger.debug("[MediaPipeline] Not a photo: {}", url)
+                        self.cache.set_hash_for_url(url, "")
+                        return None
+
+            digest = hasher.hexdigest()
+            self.cache.add_file(temp_path, digest, kind.extension)
+            temp_path = None
+            self.cache.set_hash_for_url(url, digest)
+            return digest
+        except (requests.RequestException, OSError) as e:
+            logger.warning(f"[MediaPipeline] Failed to download {url}: {e}")
+            return None
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
@@ -1,6 +1,66 @@
+import json
+import re
+
 import requests
+from loguru import logger
 
 from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.post import Batch, Post, SOURCE_DC_INSIDE
+
+
+def escape_text(text: str) -> str:
+    # const_regex_to_escape = r"(?<!\\)(_|\*|\[|\]|\(|\)|\~|`|>|#|\+|-|=|\||\{|\}|\.|\!)"
+    const_regex_to_escape = r"(?<!\\)(_|\*|\[|\]|\(|\)|\~|`|>|#|\+|=|\||\{|\})"
+    text = re.sub(const_regex_to_escape, lambda t: "\\" + t.group(), text)
+    return text
+
+
+def format_post(post: Post) -> str:
+    if post.source == SOURCE_DC_INSIDE:
+        if post.text:
+            return f"{post.title} ({escape_text(post.text)})"
+        return post.title
+    # Let's pseudo-escape |title| and |text| to send them as Markdown.
+    # Escaping is not perfect now.
+    # TODO(pastry-personal5): Fix escaping. Also, fix the style of a telegram message.
+    title = escape_text(post.title)
+    if post.text:
+        return f"- \\[{post.category}]{title} ({escape_text(post.text)})"
+    return f"- \\[{post.category}]{title}"
+
+
+def format_batch(batch: Batch) -> str:
+    """
+    Formats |batch| as one message. Lines are collected in a list and joined once.
+    """
+    lines = []
+    if batch.source == SOURCE_DC_INSIDE:
+        lines.append(batch.board_id)
+    lines.extend(format_post(post) for post in batch.posts)
+    return "\n".join(lines) + "\n"
+
+
+def split_message(message: str, max_length: int = 4095) -> list:
+    """
+    Splits |message| into chunks of up to |max_length| characters at line breaks,
+    to keep each chunk under the 4096 characters of a Telegram message. A longer line is cut on its own.
+    """
+    chunks = []
+    chunk = ""
+    for line in message.splitlines(keepends=True):
+        while len(line) > max_length:
+            if chunk:
+                chunks.append(chunk)
+                chunk = ""
+            chunks.append(line[:max_length])
+            line = line[max_length:]
+        if len(chunk) + len(line) > max_length:
+            chunks.append(chunk)
+            chunk = ""
+        chunk += line
+    if chunk:
+        chunks.append(chunk)
+    return chunks
 
 
 class NotifierForTelegram:
@@ -12,10 +72,69 @@ class NotifierForTelegram:
         self.bot_token = global_config.config["notifier"]["telegram"]["config"]["bot_token"]
         self.bot_chat_id = global_config.config["notifier"]["telegram"]["config"]["bot_chat_id"]
 
-    def notify(self, message: str) -> None:
-        const_timeout_for_requests_get_in_sec = 16
+    def notify(self, batch: Batch) -> None:
+        """
+        Sends |batch| as one or more messages. See `split_message()`.
+        The text goes in the form body, so it's not limited by the URL length or mangled by URL parsing.
+        """
+        const_timeout_for_requests_post_in_sec = 16
+
+        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        for chunk in split_message(format_batch(batch)):
+            try:
+                response = requests.post(
+                    url,
+                    data={"chat_id": self.bot_chat_id, "parse_mode": "Markdown", "text": chunk},
+                    timeout=const_timeout_for_requests_post_in_sec,
+                )
+                result = response.json()
+            except (requests.RequestException, ValueError) as e:
+                logger.warning(f"Failed to send a message of ({len(chunk)}) characters: {e}")
+                continue
+            if not result.get("ok"):
+                logger.warning(f"Failed to send a message of ({len(chunk)}) characters: {result.get('description')}")
+
+    def send_photos(self, paths: list) -> list:
+        """
+        Uploads photos at |paths| with `sendPhoto` (one) or `sendMediaGroup` (two to ten).
+        Returns Telegram file IDs in the same order. An item is `None` if it was not sent.
+        `requests` reads all files into memory to build the request, so callers bound their total size.
+        """
+        const_timeout_for_requests_post_in_sec = 64
+
+        if not paths:
+            return []
+        file_objects = [open(path, "rb") for path in paths]
+        try:
+            if len(paths) == 1:
+                url = f"https://api.telegram.org/bot{self.bot_token}/sendPhoto"
+                response = requests.post(
+                    url,
+                    data={"chat_id": self.bot_chat_id},
+                    files={"photo": file_objects[0]},
+                    timeout=const_timeout_for_requests_post_in_sec,
+                )
+            else:
+                url = f"https://api.telegram.org/bot{self.bot_token}/sendMediaGroup"
+                media = [{"type": "photo", "media": f"attach://photo{i}"} for i in range(len(paths))]
+                response = requests.post(
+                    url,
+                    data={"chat_id": self.bot_chat_id, "media": json.dumps(media)},
+                    files={f"photo{i}": file_object for (i, file_object) in enumerate(file_objects)},
+                    timeout=const_timeout_for_requests_post_in_sec,
+                )
+            result = response.json()
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Failed to send ({len(paths)}) photos: {e}")
+            return [None] * len(paths)
+        finally:
+            for file_object in file_objects:
+                file_object.close()
 
-        bot_token = self.bot_token
-        bot_chat_id = self.bot_chat_id
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage?chat_id={bot_chat_id}&parse_mode=Markdown&text={message}"
-        requests.get(url, timeout=const_timeout_for_requests_get_in_sec)
+        if not result.get("ok"):
+            logger.warning(f"Failed to send ({len(paths)}) photos: {result.get('description')}")
+            return [None] * len(paths)
+        messages = result["result"] if isinstance(result["result"], list) else [result["result"]]
+        # The last `PhotoSize` is the largest one.
+        file_ids = [message["photo"][-1]["file_id"] if message.get("photo") else None for message in messages]
+        return (file_ids + [None] * len(paths))[:len(paths)]
@@ -0,0 +1,76 @@
+import datetime
+
+
+SOURCE_DC_INSIDE = "dc_inside"
+SOURCE_FM_KOREA = "fm_korea"
+
+
+class Post:
+    """
+    A post found by a crawler.
+    Fields are kept raw. Escaping and formatting happen once, at notify time.
+    """
+
+    __slots__ = ("source", "board_id", "post_id", "title", "author", "time", "category", "text", "url", "media_urls")
+
+    def __init__(
+        self,
+        source: str,
+        board_id: str,
+        title: str,
+        post_id: int | None = None,
+        author: str | None = None,
+        time: datetime.datetime | None = None,
+        category: str | None = None,
+        text: str | None = None,
+        url: str | None = None,
+        media_urls: list | None = None,
+    ):
+        self.source = source
+        self.board_id = board_id
+        self.post_id = post_id
+        self.title = title
+        self.author = author
+        self.time = time
+        self.category = category
+        self.text = text
+        self.url = url
+        self.media_urls = media_urls if media_urls is not None else []
+
+    def to_dict(self) -> dict:
+        return {
+            "source": self.source,
+            "board_id": self.board_id,
+            "post_id": self.post_id,
+            "title": self.title,
+            "author": self.author,
+            "time": self.time.isoformat() if self.time else None,
+            "category": self.category,
+            "text": self.text,
+            "url": self.url,
+            "media_urls": self.media_urls,
+        }
+
+    def __repr__(self):
+        return f"Post({self.source}, {self.board_id}, {self.post_id}, {self.title!r})"
+
+
+class Batch:
+    """
+    Posts found by one fetch of one board, in the order they are sent.
+    `max_of_id` is the watermark after this fetch. It is `None` for boards without numeric IDs.
+    """
+
+    __slots__ = ("source", "board_id", "posts", "max_of_id")
+
+    def __init__(self, source: str, board_id: str, posts: list | None = None, max_of_id: int | None = None):
+        self.source = source
+        self.board_id = board_id
+        self.posts = posts if posts is not None else []
+        self.max_of_id = max_of_id
+
+    def __len__(self):
+        return len(self.posts)
+
+    def __repr__(self):
+        return f"Batch({self.source}, {self.board_id}, {len(self.posts)} posts, max_of_id={self.max_of_id})"
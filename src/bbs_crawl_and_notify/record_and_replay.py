@@ -0,0 +1,305 @@
+"""
+This module records crawler I/O to a file and replays it later, without the live sites.
+
+Record mode wraps the HTTP GET function of `CrawlerForFMKorea` and the `dc_api.API` used by `fetch()`.
+Each response is written as one line of a gzip-compressed JSONL file with its time offset.
+Replay mode feeds those responses back through the same code paths. A stub replaces the browser.
+`AcceleratedEvent` replaces `exit_event`, so every `exit_event.wait()` sleep and 15 s interval
+runs `speedup` times faster than real time.
+
+e.g.
+record_and_replay:
+  mode: "record"  # or "replay"
+  path: "./recordings/session.jsonl.gz"
+  speedup: 60  # Replay only.
+"""
+
+import base64
+import collections
+import datetime
+import gzip
+import json
+import threading
+import time
+
+import dc_api
+import requests
+from loguru import logger
+
+from bbs_crawl_and_notify.link_visitor_client_context import LinkVisitorClientContext
+
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+KIND_HTTP = "http"
+KIND_DC_BOARD = "dc_board"
+KIND_DC_DOCUMENT = "dc_document"
+
+
+def index_to_dict(index: dc_api.DocumentIndex) -> dict:
+    return {
+        "id": index.id,
+        "board_id": index.board_id,
+        "title": index.title,
+        "has_image": index.has_image,
+        "author": index.author,
+        "time": index.time.isoformat() if index.time else None,
+        "view_count": index.view_count,
+        "comment_count": index.comment_count,
+        "voteup_count": index.voteup_count,
+        "subject": index.subject,
+        "image_available": index.image_available,
+    }
+
+
+def dict_to_index(record: dict) -> dc_api.DocumentIndex:
+    return dc_api.DocumentIndex(
+        id=record["id"],
+        board_id=record["board_id"],
+        title=record["title"],
+        has_image=record["has_image"],
+        author=record["author"],
+        time=datetime.datetime.fromisoformat(record["time"]) if record["time"] else None,
+        view_count=record["view_count"],
+        comment_count=record["comment_count"],
+        voteup_count=record["voteup_count"],
+        document=None,
+        comments=None,
+        subject=record["subject"],
+        image_available=record["image_available"],
+    )
+
+
+class IORecorder:
+    """
+    It appends events to a gzip-compressed JSONL file. It is safe to use from many threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.started_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+
+    def write_event(self, event: dict) -> None:
+        event["t"] = round(time.monotonic() - self.started_at, 3)
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self.lock:
+            if not self.file.closed:
+                self.file.write(line)
+
+    def close(self, timeout: float | None = None) -> None:
+        # `timeout` is accepted to be used as a `ShutdownCoordinator` callback.
+        with self.lock:
+            self.file.close()
+
+    def wrap_http_get(self, http_get):
+        def recording_http_get(url: str, **kwargs) -> requests.Response:
+            response = http_get(url, **kwargs)
+            self.write_event({
+                "kind": KIND_HTTP,
+                "url": url,
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "body": base64.b64encode(response.content).decode("ascii"),
+            })
+            return response
+
+        return recording_http_get
+
+    def create_api_factory(self):
+        return lambda: RecordingDCAPI(self, dc_api.API())
+
+
+class RecordingDCAPI:
+
+    def __init__(self, recorder: IORecorder, api: dc_api.API):
+        self.recorder = recorder
+        self.api = api
+
+    @property
+    def session(self):
+        # It lets `apply_rate_limiter()` reach the session of the wrapped API.
+        return self.api.session
+
+    @session.setter
+    def session(self, session) -> None:
+        self.api.session = session
+
+    async def board(self, board_id, num=-1, start_page=1, document_id_lower_limit=None, **kwargs):
+        indexes = []
+        try:
+            async for index in self.api.board(board_id, num=num, start_page=start_page, document_id_lower_limit=document_id_lower_limit, **kwargs):
+                indexes.append(index_to_dict(index))
+                yield index
+        finally:
+            self.recorder.write_event({
+                "kind": KIND_DC_BOARD,
+                "board_id": board_id,
+                "start_page": start_page,
+                "indexes": indexes,
+            })
+
+    async def document(self, board_id, document_id):
+        document = await self.api.document(board_id, document_id)
+        self.recorder.write_event({
+            "kind": KIND_DC_DOCUMENT,
+            "board_id": board_id,
+            "document_id": str(document_id),
+            "contents": document.contents if document is not None else None,
+            "image_urls": [image.src for image in document.images] if document is not None else [],
+        })
+        return document
+
+    async def close(self):
+        await self.api.close()
+
+
+class ReplayedResponse:
+    """
+    It has the attributes of `requests.Response` that the crawlers use.
+    """
+
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+
+
+class ReplayedImage:
+
+    def __init__(self, src: str):
+        self.src = src
+
+
+class ReplayedDocument:
+    """
+    It has the attributes of `dc_api.Document` that the crawlers use.
+    """
+
+    def __init__(self, contents: str, image_urls: list):
+        self.contents = contents
+        self.images = [ReplayedImage(image_url) for image_url in image_urls]
+
+
+class IOPlayer:
+    """
+    It loads recorded events and hands them out in order, per URL or per board page.
+    """
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.events = collections.defaultdict(collections.deque)
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                event = json.loads(line)
+                self.events[self._get_key(event)].append(event)
+
+    @staticmethod
+    def _get_key(event: dict) -> tuple:
+        if event["kind"] == KIND_HTTP:
+            return (KIND_HTTP, event["url"])
+        if event["kind"] == KIND_DC_DOCUMENT:
+            return (KIND_DC_DOCUMENT, event["board_id"], event["document_id"])
+        return (KIND_DC_BOARD, event["board_id"], event["start_page"])
+
+    def pop_event(self, key: tuple) -> dict | None:
+        with self.lock:
+            events = self.events.get(key)
+            if not events:
+                return None
+            return events.popleft()
+
+    def http_get(self, url: str, **kwargs) -> ReplayedResponse:
+        event = self.pop_event((KIND_HTTP, url))
+        if event is None:
+            raise requests.ConnectionError(f"No recorded response left for {url}")
+        return ReplayedResponse(event["status_code"], event["headers"], base64.b64decode(event["body"]))
+
+    def create_api_factory(self):
+        return lambda: ReplayingDCAPI(self)
+
+
+class ReplayingDCAPI:
+
+    def __init__(self, player: IOPlayer):
+        self.player = player
+
+    async def board(self, board_id, num=-1, start_page=1, document_id_lower_limit=None, **kwargs):
+        event = self.player.pop_event((KIND_DC_BOARD, board_id, start_page))
+        if event is None:
+            return
+        for record in event["indexes"]:
+            if not num:
+                return
+            if document_id_lower_limit and int(document_id_lower_limit) >= int(record["id"]):
+                return
+            yield dict_to_index(record)
+            num -= 1
+
+    async def document(self, board_id, document_id):
+        event = self.player.pop_event((KIND_DC_DOCUMENT, board_id, str(document_id)))
+        if event is None or event["contents"] is None:
+            return None
+        return ReplayedDocument(event["contents"], event.get("image_urls", []))
+
+    async def close(self):
+        pass
+
+
+class ReplayDriver:
+    """
+    It stands in for the Selenium driver. The crawlers only read the HTML that was fetched with HTTP GET.
+    """
+
+    def get(self, url: str) -> None:
+        pass
+
+    def quit(self) -> None:
+        pass
+
+
+def create_client_context_for_replay(browser_profile=None) -> LinkVisitorClientContext:
+    client_context = LinkVisitorClientContext()
+    client_context.driver = ReplayDriver()
+    return client_context
+
+
+class AcceleratedEvent:
+    """
+    It is used in place of `threading.Event` for `exit_event`.
+    `wait(timeout)` returns after `timeout / speedup` real seconds, so sleeps run faster than real time.
+    `monotonic()` is the matching virtual clock, e.g. for `BoardHealthTracker`.
+    """
+
+    def __init__(self, speedup: float):
+        self.speedup = speedup
+        self.event = threading.Event()
+        self.started_at = time.monotonic()
+
+    def set(self) -> None:
+        self.event.set()
+
+    def is_set(self) -> bool:
+        return self.event.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        if timeout is None:
+            return self.event.wait()
+        return self.event.wait(timeout / self.speedup)
+
+    def monotonic(self) -> float:
+        return self.started_at + (time.monotonic() - self.started_at) * self.speedup
+
+
+class NotifierForReplay:
+    """
+    It replaces the notifier in replay mode, so replays never send messages.
+    """
+
+    def prepare(self, global_config) -> None:
+        pass
+
+    def notify(self, batch) -> None:
+        logger.info("[replay] Would notify: {}", batch)
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+from threading import Thread
+
+from loguru import logger
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+
+
+async def cancel_all_tasks(timeout_in_sec: float) -> None:
+    """
+    Cancels every task on the running loop, except the caller, and waits for them up to |timeout_in_sec|.
+    Cancelled `fetch()` coroutines close their API sessions while handling the cancellation.
+    """
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.wait(tasks, timeout=timeout_in_sec)
+
+
+class ShutdownCoordinator:
+    """
+    It stops the application within one global deadline, no matter how many threads are running.
+
+    Steps run in this order and share the deadline:
+    1. Set `exit_event`.
+    2. Cancel asyncio tasks, then stop the loop.
+    3. Run the registered callbacks (e.g. flushing the archive) in parallel.
+    4. Join all threads against the deadline. It is not a timeout per thread.
+    """
+
+    # Logging writer threads run until the process exits. They are drained with `logger.complete()` instead.
+    const_ignored_thread_name_prefixes = ("loguru-writer-",)
+
+    def __init__(self):
+        self.deadline_in_sec = 5.0
+        self.callbacks = []
+
+    def prepare(self, global_config: GlobalConfigIR) -> None:
+        local_config = global_config.config.get("shutdown", {})
+        self.deadline_in_sec = float(local_config.get("deadline_in_sec", self.deadline_in_sec))
+
+    def register_callback(self, name: str, callback) -> None:
+        """
+        |callback| is called with the remaining time in seconds. It should flush and close its resources.
+        """
+        self.callbacks.append((name, callback))
+
+    def shutdown(self, global_control_context: dict) -> bool:
+        """
+        Returns `True` if everything stopped before the deadline.
+        """
+        deadline = time.monotonic() + self.deadline_in_sec
+
+        def get_remaining_time() -> float:
+            return max(0.0, deadline - time.monotonic())
+
+        logger.info(f"[ShutdownCoordinator] Shutting down within ({self.deadline_in_sec}) seconds...")
+        global_control_context["exit_event"].set()
+
+        loop = global_control_context.get("asyncio_loop")
+        if loop is not None and loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(cancel_all_tasks(get_remaining_time()), loop)
+            try:
+                future.result(timeout=get_remaining_time())
+            except Exception as e:
+                logger.warning(f"[ShutdownCoordinator] Failed to cancel asyncio tasks in time: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+
+        for name, callback in self.callbacks:
+            logger.info(f"[ShutdownCoordinator] Running callback: {name}")
+            Thread(target=callback, name=f"ShutdownCoordinator::{name}", args=(get_remaining_time(),), daemon=True).start()
+
+        for thread in self._get_threads_to_join():
+            thread.join(timeout=get_remaining_time())
+
+        alive_threads = [thread.name for thread in self._get_threads_to_join() if thread.is_alive()]
+        if alive_threads:
+            logger.warning(f"[ShutdownCoordinator] Deadline passed. Threads still alive: {alive_threads}")
+            logger.complete()
+            return False
+        logger.info("[ShutdownCoordinator] All threads stopped.")
+        logger.complete()
+        return True
+
+    def _get_threads_to_join(self) -> list:
+        current_thread = threading.current_thread()
+        return [
+            thread for thread in threading.enumerate()
+            if thread is not current_thread and not thread.name.startswith(self.const_ignored_thread_name_prefixes)
+        ]
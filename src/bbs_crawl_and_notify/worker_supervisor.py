@@ -0,0 +1,205 @@
+import threading
+import time
+from threading import Thread
+
+from loguru import logger
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+
+
+STATE_RUNNING = "running"
+STATE_STALLED = "stalled"
+STATE_DEAD = "dead"
+STATE_STOPPED = "stopped"
+
+
+class SupervisedWorker:
+
+    __slots__ = (
+        "name", "target", "thread", "generation", "state", "started_at",
+        "last_heartbeat_at", "restart_count", "consecutive_restarts", "restart_at",
+    )
+
+    def __init__(self, name: str, target):
+        self.name = name
+        self.target = target
+        self.thread = None
+        self.generation = 0
+        self.state = STATE_RUNNING
+        self.started_at = 0.0
+        self.last_heartbeat_at = 0.0
+        self.restart_count = 0
+        self.consecutive_restarts = 0
+        self.restart_at = None
+
+
+class WorkerSupervisor:
+    """
+    It keeps board workers and controller loops running.
+
+    A worker is a function which takes `heartbeat`. It calls `heartbeat()` at least once per iteration.
+    `heartbeat()` returns `False` when the worker has been replaced, and then the worker should return.
+
+    - Dead: the thread exited before `exit_event` was set.
+    - Stalled: no heartbeat for `stall_timeout_in_sec`. A stalled thread cannot be killed,
+      so a new generation is started and the old one exits at its next heartbeat.
+    Restarts back off exponentially from `backoff_base_in_sec` up to `backoff_cap_in_sec`.
+    The backoff is reset once a worker has run for `stable_after_in_sec`.
+    Workers keep their state (e.g. `max_of_id`) on their owners, so a new generation resumes from it.
+    Every `report_interval_in_sec`, it logs `get_report()`: the liveness of workers and whatever their owners
+    added with `add_report_source()`.
+
+    e.g.
+    supervisor:
+      check_interval_in_sec: 5
+      stall_timeout_in_sec: 900  # Keep it above the longest wait of a worker, e.g. `backoff_cap_in_sec` of `circuit_breaker`.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.check_interval_in_sec = 5.0
+        self.stall_timeout_in_sec = 900.0
+        self.backoff_base_in_sec = 1.0
+        self.backoff_cap_in_sec = 300.0
+        self.stable_after_in_sec = 300.0
+        self.report_interval_in_sec = 300.0
+        self.workers = {}
+        self.report_sources = {}  # name -> function which returns a snapshot. See `add_report_source()`.
+        self.lock = threading.Lock()
+
+    def prepare(self, global_config: GlobalConfigIR) -> None:
+        local_config = global_config.config.get("supervisor", {})
+        self.check_interval_in_sec = float(local_config.get("check_interval_in_sec", self.check_interval_in_sec))
+        self.stall_timeout_in_sec = float(local_config.get("stall_timeout_in_sec", self.stall_timeout_in_sec))
+        self.backoff_base_in_sec = float(local_config.get("backoff_base_in_sec", self.backoff_base_in_sec))
+        self.backoff_cap_in_sec = float(local_config.get("backoff_cap_in_sec", self.backoff_cap_in_sec))
+        self.stable_after_in_sec = float(local_config.get("stable_after_in_sec", self.stable_after_in_sec))
+        self.report_interval_in_sec = float(local_config.get("report_interval_in_sec", self.report_interval_in_sec))
+
+    def register(self, name: str, target) -> Thread:
+        """
+        Starts |target| in a daemon thread named |name| and supervises it. Returns the thread.
+        """
+        with self.lock:
+            worker = SupervisedWorker(name, target)
+            self.workers[name] = worker
+            self._start_worker(worker)
+            return worker.thread
+
+    def heartbeat(self, name: str, generation: int) -> bool:
+        with self.lock:
+            worker = self.workers[name]
+            if worker.generation != generation:
+                return False
+            worker.last_heartbeat_at = self.clock()
+            if worker.state == STATE_STALLED:
+                logger.info(f"[WorkerSupervisor] ({name}) recovered before restart.")
+                worker.state = STATE_RUNNING
+                worker.restart_at = None
+            return True
+
+    def check(self, exit_event) -> None:
+        """
+        Finds dead and stalled workers and restarts the ones whose backoff has passed.
+        """
+        now = self.clock()
+        with self.lock:
+            for worker in self.workers.values():
+                if worker.state == STATE_STOPPED:
+                    continue
+                if not worker.thread.is_alive():
+                    if exit_event.is_set():
+                        worker.state = STATE_STOPPED
+                        continue
+                    if worker.state != STATE_DEAD:
+                        self._schedule_restart(worker, STATE_DEAD, now)
+                elif worker.state == STATE_RUNNING:
+                    if now - worker.last_heartbeat_at > self.stall_timeout_in_sec:
+                        self._schedule_restart(worker, STATE_STALLED, now)
+                    elif worker.consecutive_restarts and now - worker.started_at >= self.stable_after_in_sec:
+                        worker.consecutive_restarts = 0
+                if worker.restart_at is not None and now >= worker.restart_at and not exit_event.is_set():
+                    logger.info(f"[WorkerSupervisor] Restarting ({worker.name})...")
+                    worker.restart_count += 1
+                    self._start_worker(worker)
+
+    def get_liveness(self) -> dict:
+        """
+        Returns the state of each worker, for monitoring.
+        """
+        now = self.clock()
+        with self.lock:
+            return {
+                name: {
+                    "state": worker.state,
+                    "alive": worker.thread.is_alive(),
+                    "generation": worker.generation,
+                    "restart_count": worker.restart_count,
+                    "seconds_since_heartbeat": round(now - worker.last_heartbeat_at, 1),
+                }
+                for name, worker in self.workers.items()
+            }
+
+    def add_report_source(self, name: str, get_snapshot) -> None:
+        """
+        Includes the result of |get_snapshot| in `get_report()` under |name|, e.g. `CrawlerForDCInside.get_board_health`.
+        """
+        with self.lock:
+            self.report_sources[name] = get_snapshot
+
+    def get_report(self) -> dict:
+        """
+        Returns `get_liveness()` under "liveness" along with a snapshot from each report source.
+        """
+        report = {"liveness": self.get_liveness()}
+        with self.lock:
+            report_sources = list(self.report_sources.items())
+        for (name, get_snapshot) in report_sources:
+            report[name] = get_snapshot()
+        return report
+
+    def start(self, global_control_context: dict) -> None:
+        exit_event = global_control_context["exit_event"]
+
+        def run_loop() -> None:
+            reported_at = self.clock()
+            while not exit_event.is_set():
+                self.check(exit_event)
+                if self.clock() - reported_at >= self.report_interval_in_sec:
+                    logger.info("[WorkerSupervisor] Report: {}", self.get_report())
+                    reported_at = self.clock()
+                exit_event.wait(self.check_interval_in_sec)
+            logger.info("[WorkerSupervisor] Exit event is set. Exiting...")
+
+        Thread(target=run_loop, name="WorkerSupervisor::run_loop", daemon=True).start()
+
+    def _schedule_restart(self, worker: SupervisedWorker, state: str, now: float) -> None:
+        worker.state = state
+        worker.consecutive_restarts += 1
+        delay_in_sec = min(self.backoff_cap_in_sec, self.backoff_base_in_sec * 2 ** (worker.consecutive_restarts - 1))
+        worker.restart_at = now + delay_in_sec
+        logger.warning(f"[WorkerSupervisor] ({worker.name}) is {state}. Restarting in ({delay_in_sec:.1f}) seconds...")
+
+    def _start_worker(self, worker: SupervisedWorker) -> None:
+        worker.generation += 1
+        generation = worker.generation
+        worker.state = STATE_RUNNING
+        worker.started_at = self.clock()
+        worker.last_heartbeat_at = worker.started_at
+        worker.restart_at = None
+        worker.thread = Thread(
+            target=worker.target, name=worker.name, args=(lambda: self.heartbeat(worker.name, generation),), daemon=True
+        )
+        worker.thread.start()
+
+
+def start_worker(supervisor: WorkerSupervisor | None, name: str, target) -> Thread:
+    """
+    Starts |target| under |supervisor|. Without a supervisor, it starts a plain daemon thread
+    with a `heartbeat` that always returns `True`.
+    """
+    if supervisor is not None:
+        return supervisor.register(name, target)
+    t = Thread(target=target, name=name, args=(lambda: True,), daemon=True)
+    t.start()
+    return t
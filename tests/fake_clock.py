@@ -0,0 +1,10 @@
+class FakeClock:
+    """
+    A clock for `clock=` parameters. Tests move time by setting `now`.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+from threading import Event
+
+from bbs_crawl_and_notify.archive_sink_for_jsonl import ArchiveSegment, ArchiveSinkForJsonl, read_archive
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.post import Batch, Post, SOURCE_DC_INSIDE
+
+
+def create_batch(first_post_id: int, count: int) -> Batch:
+    posts = [
+        Post(SOURCE_DC_INSIDE, "board", f"title-{post_id}", post_id=post_id)
+        for post_id in range(first_post_id, first_post_id + count)
+    ]
+    return Batch(SOURCE_DC_INSIDE, "board", posts, first_post_id + count - 1)
+
+
+class TestArchiveSinkForJsonl(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = self.temp_dir.name
+        global_config = GlobalConfigIR()
+        global_config.config = {
+            "archive": {
+                "jsonl": {
+                    "config": {
+                        "directory": self.directory,
+                        "max_segment_size_in_bytes": 1,
+                        "flush_interval_in_sec": 0.01,
+                        "max_buffered_records": 2,
+                    }
+                }
+            }
+        }
+        self.global_config = global_config
+        self.archiver = ArchiveSinkForJsonl()
+        self.archiver.prepare(global_config)
+        self.archiver.start({"exit_event": Event()})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_archive_and_read(self):
+        self.archiver.archive(create_batch(1, 5))
+        self.archiver.archive(create_batch(6, 5))
+        self.archiver.stop(timeout=5)
+
+        records = list(read_archive(self.directory, 0, float("inf")))
+        self.assertEqual([record["post_id"] for record in records], list(range(1, 11)))
+        self.assertEqual(records[0]["title"], "title-1")
+
+        segment_files = [name for name in os.listdir(self.directory) if name.endswith(".jsonl.gz")]
+        self.assertGreater(len(segment_files), 1)
+
+    def test_read_range_skips_segments(self):
+        self.archiver.archive(create_batch(1, 2))
+        self.archiver.stop(timeout=5)
+        self.assertEqual(list(read_archive(self.directory, 0, 1)), [])
+
+    def test_read_without_index(self):
+        self.archiver.stop(timeout=5)
+        self.assertEqual(list(read_archive(self.directory, 0, float("inf"))), [])
+
+    def test_unclosed_segment_is_indexed_on_prepare(self):
+        self.archiver.archive(create_batch(1, 2))
+        self.archiver.stop(timeout=5)
+        # The process dies while a segment is open: no gzip trailer, no index entry, and a partial line.
+        segment = ArchiveSegment(self.directory, 100)
+        segment.write([json.dumps({"post_id": post_id, "archived_at": 100 + post_id}) + "\n" for post_id in (3, 4)], 103, 104)
+        segment.gzip_file.write(b'{"post_id": 5, "arch')
+        segment.raw_file.close()
+        self.assertEqual([record["post_id"] for record in read_archive(self.directory, 0, float("inf"))], [1, 2])
+
+        archiver = ArchiveSinkForJsonl()
+        archiver.prepare(self.global_config)
+        self.assertEqual([record["post_id"] for record in read_archive(self.directory, 0, float("inf"))], [1, 2, 3, 4])
+        self.assertEqual(list(read_archive(self.directory, 104, 104)), [{"post_id": 4, "archived_at": 104}])
+
+        # It's indexed only once.
+        archiver.prepare(self.global_config)
+        self.assertEqual(len(list(read_archive(self.directory, 0, float("inf")))), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
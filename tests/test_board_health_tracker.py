@@ -0,0 +1,60 @@
+import random
+import unittest
+
+from bbs_crawl_and_notify.board_health_tracker import BoardHealthTracker, STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN
+
+from tests.fake_clock import FakeClock
+
+
+class TestBoardHealthTracker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.tracker = BoardHealthTracker("board", clock=self.clock, rng=random.Random(0))
+        self.tracker.prepare({"failure_threshold": 2, "backoff_base_in_sec": 10, "backoff_cap_in_sec": 100})
+
+    def test_success_waits_for_interval(self):
+        self.assertTrue(self.tracker.allow_request())
+        self.tracker.record_success()
+        self.assertFalse(self.tracker.allow_request())
+        self.assertEqual(self.tracker.get_delay_in_sec(), 15)
+        self.clock.now = 15
+        self.assertTrue(self.tracker.allow_request())
+
+    def test_timeout_grows_and_resets_after_success(self):
+        for _ in range(10):
+            self.tracker.record_timeout()
+        self.assertEqual(self.tracker.timeout_in_sec, 64)
+        self.tracker.record_success()
+        self.assertEqual(self.tracker.timeout_in_sec, 8)
+
+    def test_breaker_opens_half_opens_and_closes(self):
+        self.tracker.record_failure()
+        self.assertEqual(self.tracker.state, STATE_CLOSED)
+        self.tracker.record_failure()
+        self.assertEqual(self.tracker.state, STATE_OPEN)
+        self.assertFalse(self.tracker.allow_request())
+
+        self.clock.now += self.tracker.get_delay_in_sec()
+        self.assertTrue(self.tracker.allow_request())
+        self.assertEqual(self.tracker.state, STATE_HALF_OPEN)
+        self.tracker.record_failure()
+        self.assertEqual(self.tracker.state, STATE_OPEN)
+
+        self.clock.now += self.tracker.get_delay_in_sec()
+        self.assertTrue(self.tracker.allow_request())
+        self.tracker.record_success()
+        self.assertEqual(self.tracker.state, STATE_CLOSED)
+        self.assertEqual(self.tracker.get_snapshot()["consecutive_failures"], 0)
+
+    def test_backoff_is_jittered_and_capped(self):
+        delays = []
+        for _ in range(20):
+            self.tracker.record_failure()
+            delays.append(self.tracker.get_delay_in_sec())
+        self.assertTrue(all(10 <= delay <= 100 for delay in delays))
+        self.assertGreater(len(set(delays)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from unittest.mock import MagicMock
+
+from bbs_crawl_and_notify.browser_profile import BrowserProfile
+
+
+class TestBrowserProfile(unittest.TestCase):
+
+    def test_lean_profile(self):
+        browser_profile = BrowserProfile()
+        browser_profile.prepare({"disk_cache_size_in_bytes": 1024})
+        options = browser_profile.create_chrome_options()
+        self.assertEqual(options.page_load_strategy, "eager")
+        self.assertIn("--headless=new", options.arguments)
+        self.assertIn("--disk-cache-size=1024", options.arguments)
+        self.assertIn("--host-resolver-rules=MAP * ~NOTFOUND, EXCLUDE fmkorea.com, EXCLUDE *.fmkorea.com", options.arguments)
+        self.assertEqual(options.experimental_options["prefs"], {"profile.managed_default_content_settings.images": 2})
+
+        driver = MagicMock()
+        browser_profile.apply(driver)
+        driver.execute_cdp_cmd.assert_any_call("Network.enable", {})
+
+    def test_default_profile(self):
+        browser_profile = BrowserProfile()
+        browser_profile.prepare({"lean": False})
+        options = browser_profile.create_chrome_options()
+        self.assertEqual(options.arguments, [])
+
+        driver = MagicMock()
+        browser_profile.apply(driver)
+        driver.execute_cdp_cmd.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,279 @@
+import asyncio
+import queue
+import threading
+import unittest
+from unittest.mock import patch
+
+from bbs_crawl_and_notify.crawler_for_dc_inside import DCInsideFetchOptions, DocumentBodyCache, fetch, merge_indexes_by_id, run_coroutine_to_fetch
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.host_rate_limiter import HostRateLimiter
+from bbs_crawl_and_notify.notifier_for_telegram import format_batch
+from bbs_crawl_and_notify.post import Batch
+
+
+class FakeIndex:
+    def __init__(self, document_id: int):
+        self.id = str(document_id)
+        self.title = f"title-{document_id}"
+        self.author = "author"
+        self.time = None
+        self.subject = None
+
+
+class FakeRequest:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return None
+
+
+class FakeSession:
+    def __init__(self):
+        self.urls = []
+        self.timeouts = []
+
+    def get(self, url: str, **kwargs) -> FakeRequest:
+        self.urls.append(url)
+        self.timeouts.append(kwargs.get("timeout"))
+        return FakeRequest()
+
+
+class FakeAPI:
+    """
+    It lists |newest_id|..1 on pages of |page_size| posts, newest first, like `dc_api.API.board()`.
+    Like `dc_api`, it requests a page with `session.get()` only when the previous page is used up.
+    Pages in |stalled_pages| and documents in |slow_document_ids| never arrive in time.
+    """
+
+    def __init__(self, newest_id: int, page_size: int, slow_document_ids: tuple = (), stalled_pages: tuple = ()):
+        self.newest_id = newest_id
+        self.page_size = page_size
+        self.slow_document_ids = slow_document_ids
+        self.stalled_pages = stalled_pages
+        self.session = FakeSession()
+        self.requested_pages = []
+        self.requested_documents = []
+        self.closed = False
+
+    async def board(self, board_id, num=-1, start_page=1, document_id_lower_limit=None):
+        page = start_page
+        while num:
+            async with self.session.get(f"https://m.dcinside.com/board/{board_id}?page={page}"):
+                self.requested_pages.append(page)
+            if page in self.stalled_pages:
+                await asyncio.sleep(60)
+            first_id = self.newest_id - (page - 1) * self.page_size
+            if first_id <= 0:
+                return
+            for document_id in range(first_id, max(0, first_id - self.page_size), -1):
+                if document_id_lower_limit and document_id_lower_limit >= document_id:
+                    return
+                yield FakeIndex(document_id)
+                num -= 1
+                if num == 0:
+                    return
+            page += 1
+
+    async def document(self, board_id, document_id):
+        async with self.session.get(f"https://m.dcinside.com/board/{board_id}/{document_id}"):
+            self.requested_documents.append(document_id)
+        if int(document_id) in self.slow_document_ids:
+            await asyncio.sleep(60)
+        return FakeDocument(f"body  of\n{document_id}")
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeImage:
+    def __init__(self, src: str):
+        self.src = src
+
+
+class FakeDocument:
+    def __init__(self, contents: str):
+        self.contents = contents
+        self.images = [FakeImage("https://www.example.com/image.png")]
+
+
+class TestFetchCatchUp(unittest.IsolatedAsyncioTestCase):
+
+    async def _fetch(self, fake_api: FakeAPI, max_of_id: int, fetch_options: DCInsideFetchOptions | None = None) -> Batch:
+        with patch("bbs_crawl_and_notify.crawler_for_dc_inside.dc_api.API", return_value=fake_api):
+            return await fetch("board", max_of_id, {}, fetch_options)
+
+    async def test_no_gap(self):
+        fake_api = FakeAPI(newest_id=105, page_size=20)
+        result = await self._fetch(fake_api, 100)
+        self.assertEqual(result.max_of_id, 105)
+        self.assertEqual(format_batch(result), "board\n" + "".join(f"title-{i}\n" for i in range(105, 100, -1)))
+        self.assertEqual(fake_api.requested_pages, [1])
+        self.assertTrue(fake_api.closed)
+        self.assertEqual(result.posts[0].post_id, 105)
+        self.assertEqual(result.posts[0].url, "https://m.dcinside.com/board/board/105")
+
+    async def test_gap_is_caught_up_without_loss(self):
+        fake_api = FakeAPI(newest_id=150, page_size=20)
+        result = await self._fetch(fake_api, 100)
+        self.assertEqual(result.max_of_id, 150)
+        self.assertEqual(format_batch(result), "board\n" + "".join(f"title-{i}\n" for i in range(150, 100, -1)))
+        self.assertIn(3, fake_api.requested_pages)
+        self.assertEqual(fake_api.requested_pages.count(1), 1)
+
+    async def test_exactly_num_new_posts_is_not_a_gap(self):
+        fake_api = FakeAPI(newest_id=116, page_size=20)
+        result = await self._fetch(fake_api, 100)
+        self.assertEqual(len(result.posts), 16)
+        self.assertEqual(fake_api.requested_pages, [1])
+
+    async def test_catch_up_is_bounded_by_depth(self):
+        fake_api = FakeAPI(newest_id=500, page_size=20)
+        fetch_options = DCInsideFetchOptions()
+        fetch_options.prepare({"catch_up": {"max_depth": 2, "window": 20}})
+        result = await self._fetch(fake_api, 100, fetch_options)
+        self.assertEqual(result.max_of_id, 500)
+        self.assertEqual(max(fake_api.requested_pages), 2)
+        self.assertEqual(len(result.posts), 40)
+
+    async def test_each_page_takes_from_shared_budget(self):
+        rate_limiter = HostRateLimiter(clock=lambda: 0.0)
+        global_config = GlobalConfigIR()
+        global_config.config = {"rate_limit": {"hosts": {"m.dcinside.com": {"requests_per_sec": 1, "burst": 100}}}}
+        rate_limiter.prepare(global_config)
+        fake_api = FakeAPI(newest_id=150, page_size=10)
+        with patch("bbs_crawl_and_notify.crawler_for_dc_inside.dc_api.API", return_value=fake_api):
+            await fetch("board", 100, {"host_rate_limiter": rate_limiter})
+        # Windows of 32 posts span several pages of 10. Each of those pages is charged.
+        self.assertGreater(len(fake_api.requested_pages), 4)
+        self.assertEqual(rate_limiter.buckets["m.dcinside.com"].tokens, 100 - len(fake_api.requested_pages))
+
+    async def test_waits_for_tokens_are_not_timed_out(self):
+        rate_limiter = HostRateLimiter()
+        global_config = GlobalConfigIR()
+        global_config.config = {"rate_limit": {"hosts": {"m.dcinside.com": {"requests_per_sec": 20, "burst": 1}}}}
+        rate_limiter.prepare(global_config)
+        fake_api = FakeAPI(newest_id=150, page_size=10)
+        session = fake_api.session
+        fetch_options = DCInsideFetchOptions()
+        fetch_options.prepare({"list_timeout_in_sec": 0.02})
+        with patch("bbs_crawl_and_notify.crawler_for_dc_inside.dc_api.API", return_value=fake_api):
+            result = await fetch("board", 100, {"host_rate_limiter": rate_limiter}, fetch_options)
+        # Pages wait for tokens longer than the list timeout, and still nothing is lost.
+        self.assertEqual([post.post_id for post in result.posts], list(range(150, 100, -1)))
+        self.assertEqual({timeout.total for timeout in session.timeouts}, {0.02})
+
+    async def test_timed_out_page_holds_max_of_id(self):
+        fake_api = FakeAPI(newest_id=150, page_size=20, stalled_pages=(2,))
+        fetch_options = DCInsideFetchOptions()
+        fetch_options.prepare({"list_timeout_in_sec": 0.2})
+        result = await self._fetch(fake_api, 100, fetch_options)
+        # Posts 130..111 were not read, so only the ones below them are sent.
+        self.assertEqual(result.max_of_id, 110)
+        self.assertEqual([post.post_id for post in result.posts], list(range(110, 100, -1)))
+
+        fake_api = FakeAPI(newest_id=150, page_size=20)
+        result = await self._fetch(fake_api, result.max_of_id)
+        self.assertEqual([post.post_id for post in result.posts], list(range(150, 110, -1)))
+
+    async def test_timed_out_first_read_is_a_failure(self):
+        fake_api = FakeAPI(newest_id=105, page_size=3, stalled_pages=(2,))
+        fetch_options = DCInsideFetchOptions()
+        fetch_options.prepare({"list_timeout_in_sec": 0.2})
+        with self.assertRaises(asyncio.TimeoutError):
+            await self._fetch(fake_api, 100, fetch_options)
+        self.assertTrue(fake_api.closed)
+
+    async def test_catch_up_disabled(self):
+        fake_api = FakeAPI(newest_id=150, page_size=20)
+        fetch_options = DCInsideFetchOptions()
+        fetch_options.prepare({"catch_up": {"enabled": False}})
+        result = await self._fetch(fake_api, 100, fetch_options)
+        self.assertEqual(len(result.posts), 16)
+        self.assertEqual(fake_api.requested_pages, [1])
+
+
+class TestFetchBodies(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.fetch_options = DCInsideFetchOptions()
+        self.fetch_options.prepare({"body_fetch": {"enabled": True, "timeout_in_sec": 0.2, "deadline_in_sec": 1, "cache_size": 2}})
+
+    async def _fetch(self, fake_api: FakeAPI, max_of_id: int, timeout_in_sec: float | None = None) -> Batch:
+        with patch("bbs_crawl_and_notify.crawler_for_dc_inside.dc_api.API", return_value=fake_api):
+            return await fetch("board", max_of_id, {}, self.fetch_options, timeout_in_sec)
+
+    async def test_bodies_are_fetched_and_cached(self):
+        result = await self._fetch(FakeAPI(newest_id=102, page_size=20), 100)
+        self.assertEqual([post.text for post in result.posts], ["body of 102", "body of 101"])
+        self.assertEqual(result.posts[0].media_urls, ["https://www.example.com/image.png"])
+
+        fake_api = FakeAPI(newest_id=102, page_size=20)
+        result = await self._fetch(fake_api, 100)
+        self.assertEqual(fake_api.requested_documents, [])
+        self.assertEqual(result.posts[0].text, "body of 102")
+
+    async def test_slow_body_does_not_hold_titles(self):
+        result = await self._fetch(FakeAPI(newest_id=103, page_size=20, slow_document_ids=(102,)), 100)
+        self.assertEqual([post.title for post in result.posts], ["title-103", "title-102", "title-101"])
+        self.assertEqual([post.text for post in result.posts], ["body of 103", None, "body of 101"])
+
+    async def test_bodies_end_within_caller_timeout(self):
+        self.fetch_options.prepare({"body_fetch": {"enabled": True, "timeout_in_sec": 60, "deadline_in_sec": 60}})
+        fake_api = FakeAPI(newest_id=102, page_size=20, slow_document_ids=(101, 102))
+        result = await asyncio.wait_for(self._fetch(fake_api, 100, timeout_in_sec=1.5), 1.5)
+        self.assertEqual([post.title for post in result.posts], ["title-102", "title-101"])
+        self.assertEqual([post.text for post in result.posts], [None, None])
+
+    async def test_disabled_by_default(self):
+        self.fetch_options = DCInsideFetchOptions()
+        fake_api = FakeAPI(newest_id=102, page_size=20)
+        result = await self._fetch(fake_api, 100)
+        self.assertEqual(fake_api.requested_documents, [])
+        self.assertIsNone(result.posts[0].text)
+
+
+class TestDocumentBodyCache(unittest.TestCase):
+
+    def test_least_recently_used_is_evicted(self):
+        cache = DocumentBodyCache(2)
+        cache.put(("board", 1), ("a", []))
+        cache.put(("board", 2), ("b", []))
+        self.assertEqual(cache.get(("board", 1)), ("a", []))
+        cache.put(("board", 3), ("c", []))
+        self.assertIsNone(cache.get(("board", 2)))
+        self.assertEqual(cache.get(("board", 1)), ("a", []))
+        self.assertEqual(len(cache), 2)
+
+
+class TestMergeIndexesById(unittest.TestCase):
+
+    def test_merge(self):
+        merged = merge_indexes_by_id([FakeIndex(3), FakeIndex(5), FakeIndex(3), FakeIndex(4)])
+        self.assertEqual([index.id for index in merged], ["5", "4", "3"])
+
+
+class TestRunCoroutineToFetch(unittest.TestCase):
+
+    def test_replaced_worker_exits(self):
+        q = queue.Queue()
+        run_coroutine_to_fetch(q, "board", 0, {"exit_event": threading.Event()}, heartbeat=lambda: False)
+        self.assertTrue(q.empty())
+
+    def test_replaced_worker_does_not_put_its_result(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            q = queue.Queue()
+            heartbeats = iter([True, False])  # It's replaced while its fetch is running.
+            with patch("bbs_crawl_and_notify.crawler_for_dc_inside.dc_api.API", return_value=FakeAPI(newest_id=3, page_size=20)):
+                run_coroutine_to_fetch(q, "board", 0, {"exit_event": threading.Event(), "asyncio_loop": loop}, heartbeat=lambda: next(heartbeats))
+            self.assertTrue(q.empty())
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
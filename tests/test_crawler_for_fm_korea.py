@@ -1,7 +1,10 @@
+import threading
 import unittest
 from unittest.mock import MagicMock, patch
 from selenium.common.exceptions import WebDriverException
-from bbs_crawl_and_notify.crawler_for_fm_korea import visit_page, remove_urls, remove_video_tag_message
+from bbs_crawl_and_notify.crawler_for_fm_korea import CrawlerForFMKorea, visit_page, remove_urls, remove_video_tag_message
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.host_rate_limiter import HostRateLimiter
 
 class TestVisitPage(unittest.TestCase):
     @patch("bbs_crawl_and_notify.crawler_for_fm_korea.logger")
@@ -64,3 +67,69 @@ class TestVisitPage(unittest.TestCase):
 
         if __name__ == "__main__":
             unittest.main()
+
+
+def create_response(content: bytes) -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    response.content = content
+    response.headers = {}
+    return response
+
+
+class TestGetMessageToSend(unittest.TestCase):
+    const_list_page = (
+        '<table>'
+        '<tr><td class="cate"><a>cat</a></td><td class="title hotdeal_var8"><a href="/2">second</a></td></tr>'
+        '<tr><td class="cate"><a>cat</a></td><td class="title hotdeal_var8"><a href="/1">first</a></td></tr>'
+        '</table>'
+    ).encode("utf-8")
+    const_article_page = '<div class="xe_content">body</div>'.encode("utf-8")
+
+    def setUp(self):
+        self.requested_urls = []
+        self.crawler = CrawlerForFMKorea()
+        self.crawler.http_get = self._http_get
+        self.crawler.list_page_change_detector.http_get = self._http_get
+        self.crawler.client_context_factory = MagicMock()
+        self.crawler.visited_item_recorder = MagicMock()
+        self.crawler.visited_item_recorder.is_visited.return_value = False
+        # With a budget for the host, articles are paced by the limiter instead of a fixed sleep.
+        rate_limiter = HostRateLimiter()
+        global_config = GlobalConfigIR()
+        global_config.config = {"rate_limit": {"hosts": {"www.fmkorea.com": {"requests_per_sec": 1000, "burst": 1000}}}}
+        rate_limiter.prepare(global_config)
+        self.global_control_context = {"exit_event": threading.Event(), "host_rate_limiter": rate_limiter}
+        self.patcher = patch("bbs_crawl_and_notify.crawler_for_fm_korea.wait_until_ready")
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+
+    def _http_get(self, url: str, **kwargs) -> MagicMock:
+        self.requested_urls.append(url)
+        if "index.php" in url:
+            return create_response(self.const_list_page)
+        return create_response(self.const_article_page)
+
+    def test_unchanged_page_skips_browser_and_articles(self):
+        batch = self.crawler.get_message_to_send(self.global_control_context)
+        self.assertEqual([post.title for post in batch.posts], ["first", "second"])
+        self.assertEqual([post.text for post in batch.posts], ["body", "body"])
+        self.assertEqual(self.crawler.client_context_factory.call_count, 1)
+
+        self.requested_urls = []
+        batch = self.crawler.get_message_to_send(self.global_control_context)
+        self.assertEqual(batch.posts, [])
+        self.assertEqual(self.crawler.client_context_factory.call_count, 1)
+        self.assertEqual(len(self.requested_urls), 1)
+
+    def test_page_failed_halfway_is_processed_again(self):
+        self.crawler.visited_item_recorder.add_item.side_effect = [None, RuntimeError("Failed to record")]
+        with self.assertRaises(RuntimeError):
+            self.crawler.get_message_to_send(self.global_control_context)
+
+        self.crawler.visited_item_recorder.add_item.side_effect = None
+        batch = self.crawler.get_message_to_send(self.global_control_context)
+        self.assertEqual(self.crawler.client_context_factory.call_count, 2)
+        self.assertEqual(len(batch.posts), 2)
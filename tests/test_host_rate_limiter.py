@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import unittest
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.host_rate_limiter import HostRateLimiter
+
+from tests.fake_clock import FakeClock
+
+
+class TestHostRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.rate_limiter = HostRateLimiter(clock=self.clock)
+        global_config = GlobalConfigIR()
+        global_config.config = {
+            "rate_limit": {
+                "hosts": {
+                    "m.dcinside.com": {"requests_per_sec": 2, "burst": 3},
+                },
+            },
+        }
+        self.rate_limiter.prepare(global_config)
+
+    def test_burst_then_wait_in_order(self):
+        for _ in range(3):
+            self.assertEqual(self.rate_limiter.reserve("m.dcinside.com"), 0)
+        self.assertEqual(self.rate_limiter.reserve("m.dcinside.com"), 0.5)
+        self.assertEqual(self.rate_limiter.reserve("m.dcinside.com"), 1.0)
+        self.clock.now = 10
+        self.assertEqual(self.rate_limiter.reserve("m.dcinside.com"), 0)
+
+    def test_host_is_read_from_url(self):
+        for _ in range(3):
+            self.rate_limiter.reserve("https://m.dcinside.com/board/a")
+        self.assertGreater(self.rate_limiter.reserve("m.dcinside.com"), 0)
+
+    def test_unconfigured_host_is_not_limited(self):
+        for _ in range(100):
+            self.assertEqual(self.rate_limiter.reserve("https://www.fmkorea.com/"), 0)
+        self.assertFalse(self.rate_limiter.has_budget("https://www.fmkorea.com/"))
+        self.assertTrue(self.rate_limiter.has_budget("https://m.dcinside.com/board/a"))
+
+    def test_default_budget(self):
+        global_config = GlobalConfigIR()
+        global_config.config = {"rate_limit": {"default": {"requests_per_sec": 1}}}
+        self.rate_limiter.prepare(global_config)
+        self.assertEqual(self.rate_limiter.reserve("www.fmkorea.com"), 0)
+        self.assertEqual(self.rate_limiter.reserve("www.fmkorea.com"), 1.0)
+
+    def test_acquire_returns_false_on_exit(self):
+        for _ in range(3):
+            self.rate_limiter.reserve("m.dcinside.com")
+        exit_event = threading.Event()
+        exit_event.set()
+        self.assertFalse(self.rate_limiter.acquire("m.dcinside.com", exit_event))
+        # The aborted request gave its token back.
+        self.assertEqual(self.rate_limiter.reserve("m.dcinside.com"), 0.5)
+
+    def test_cancelled_waiters_give_tokens_back(self):
+        async def cancel_waiters():
+            for _ in range(3):
+                self.rate_limiter.reserve("m.dcinside.com")
+            tasks = [asyncio.ensure_future(self.rate_limiter.acquire_async("m.dcinside.com")) for _ in range(10)]
+            await asyncio.sleep(0)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run(cancel_waiters())
+        self.assertEqual(self.rate_limiter.reserve("m.dcinside.com"), 0.5)
+
+    def test_acquire_async_waits(self):
+        self.rate_limiter.speedup = 100
+        for _ in range(3):
+            self.rate_limiter.reserve("m.dcinside.com")
+        asyncio.run(self.rate_limiter.acquire_async("m.dcinside.com"))
+        self.assertGreater(self.rate_limiter.reserve("m.dcinside.com"), 0.5)
@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import MagicMock
+
+from bbs_crawl_and_notify.list_page_change_detector import ListPageChangeDetector
+
+
+def create_response(status_code: int, content: bytes, headers: dict | None = None) -> MagicMock:
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    return response
+
+
+def create_list_page(hrefs: list, view_count: int) -> bytes:
+    rows = "".join(
+        f'<tr><td class="title hotdeal_var8"><a href="{href}">t</a></td><td class="m_no">{view_count}</td></tr>'
+        for href in hrefs
+    )
+    return f"<table>{rows}</table>".encode("utf-8")
+
+
+class TestListPageChangeDetector(unittest.TestCase):
+    def setUp(self):
+        self.detector = ListPageChangeDetector()
+        self.url = "https://www.example.com/list"
+
+    def test_first_visit_is_changed(self):
+        response = create_response(200, create_list_page(["/1", "/2"], 10))
+        self.assertTrue(self.detector.has_changed(self.url, response))
+
+    def _visit(self, response: MagicMock) -> bool:
+        changed = self.detector.has_changed(self.url, response)
+        self.detector.commit(self.url)
+        return changed
+
+    def test_same_links_with_other_counts_are_not_changed(self):
+        self._visit(create_response(200, create_list_page(["/1", "/2"], 10)))
+        self.assertFalse(self.detector.has_changed(self.url, create_response(200, create_list_page(["/1", "/2"], 99))))
+
+    def test_new_link_is_changed(self):
+        self._visit(create_response(200, create_list_page(["/1", "/2"], 10)))
+        self.assertTrue(self.detector.has_changed(self.url, create_response(200, create_list_page(["/3", "/1", "/2"], 10))))
+
+    def test_page_is_changed_until_commit(self):
+        response = create_response(200, create_list_page(["/1", "/2"], 10))
+        self.assertTrue(self.detector.has_changed(self.url, response))
+        # Processing failed, so `commit()` was not called.
+        self.assertTrue(self.detector.has_changed(self.url, response))
+        self.detector.commit(self.url)
+        self.assertFalse(self.detector.has_changed(self.url, response))
+
+    def test_not_modified(self):
+        self.assertFalse(self.detector.has_changed(self.url, create_response(304, b"")))
+
+    def test_page_without_links_is_always_changed(self):
+        self.assertTrue(self.detector.has_changed(self.url, create_response(200, b"<html></html>")))
+        self.assertTrue(self.detector.has_changed(self.url, create_response(200, b"<html></html>")))
+
+    def test_conditional_headers(self):
+        self.assertEqual(self.detector.get_conditional_headers(self.url), {})
+        headers = {"ETag": '"abc"', "Last-Modified": "Mon, 19 Oct 2026 00:00:00 GMT"}
+        self.detector.has_changed(self.url, create_response(200, create_list_page(["/1"], 1), headers))
+        self.assertEqual(self.detector.get_conditional_headers(self.url), {})
+        self.detector.commit(self.url)
+        self.assertEqual(
+            self.detector.get_conditional_headers(self.url),
+            {"If-None-Match": '"abc"', "If-Modified-Since": "Mon, 19 Oct 2026 00:00:00 GMT"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import io
+import sys
+import unittest
+
+from loguru import logger
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.logging_controller import configure_logging
+
+
+class TestConfigureLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = io.StringIO()
+
+    def tearDown(self):
+        logger.remove()
+        logger.configure(patcher=None)
+        logger.enable("bbs_crawl_and_notify")
+        logger.add(sys.stderr)
+
+    def _configure(self, local_config: dict) -> None:
+        global_config = GlobalConfigIR()
+        global_config.config = {"logging": local_config}
+        configure_logging(global_config, sink=self.sink)
+
+    def test_long_message_is_truncated(self):
+        self._configure({"enqueue": False, "max_message_length": 8})
+        logger.info("0123456789abcdef")
+        self.assertIn("01234567...(+8 chars)", self.sink.getvalue())
+
+    def test_disabled_level_is_not_formatted(self):
+        self._configure({"enqueue": False, "level": "INFO"})
+        calls = []
+        logger.opt(lazy=True).debug("{}", lambda: calls.append(1))
+        self.assertEqual(calls, [])
+        self.assertEqual(self.sink.getvalue(), "")
+
+    def test_component_level(self):
+        self._configure({"enqueue": False, "level": "WARNING", "components": {"logging_controller": "DEBUG"}})
+        logger.patch(lambda record: record.update(name="bbs_crawl_and_notify.logging_controller")).debug("from component")
+        logger.info("from elsewhere")
+        output = self.sink.getvalue()
+        self.assertIn("from component", output)
+        self.assertNotIn("from elsewhere", output)
+
+    def test_enqueued_and_serialized(self):
+        self._configure({"enqueue": True, "serialize": True})
+        logger.info("hello")
+        logger.complete()
+        self.assertIn('"message": "hello"', self.sink.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
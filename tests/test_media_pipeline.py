@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.media_pipeline import MediaCache, MediaPipeline
+from bbs_crawl_and_notify.post import Batch, Post, SOURCE_DC_INSIDE
+
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+def create_response(content: bytes, chunk_size: int = 4096) -> MagicMock:
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {}
+    response.iter_content.side_effect = lambda _: (content[i:i + chunk_size] for i in range(0, len(content), chunk_size))
+    response.__enter__.return_value = response
+    return response
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.sent = []
+
+    def send_photos(self, paths: list) -> list:
+        self.sent.append(list(paths))
+        return [f"file-id-{len(self.sent)}-{i}" for i in range(len(paths))]
+
+
+class TestMediaPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        global_config = GlobalConfigIR()
+        global_config.config = {
+            "media": {
+                "config": {
+                    "cache_directory": self.temp_dir.name,
+                    "max_file_size_in_bytes": 64 * 1024,
+                    "media_group_size": 2,
+                }
+            }
+        }
+        self.media_pipeline = MediaPipeline()
+        self.media_pipeline.prepare(global_config)
+        self.notifier = FakeNotifier()
+        self.contents = {
+            "https://www.example.com/a.png": PNG_HEADER + b"a" * 10000,
+            "https://www.example.com/b.png": PNG_HEADER + b"b" * 10000,
+            "https://www.example.com/copy-of-a.png": PNG_HEADER + b"a" * 10000,
+            "https://www.example.com/c.png": PNG_HEADER + b"c" * 10000,
+            "https://www.example.com/large.png": PNG_HEADER + b"l" * 100000,
+            "https://www.example.com/text.html": b"<html>" + b" " * 10000,
+        }
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _process(self, urls: list) -> MagicMock:
+        batch = Batch(SOURCE_DC_INSIDE, "board", [Post(SOURCE_DC_INSIDE, "board", "title", post_id=1, media_urls=urls)])
+        with patch("bbs_crawl_and_notify.media_pipeline.requests.get", side_effect=lambda url, **_: create_response(self.contents[url])) as mock_get:
+            self.media_pipeline.process_now(batch, self.notifier)
+        return mock_get
+
+    def test_images_are_sent_in_groups_and_deduplicated(self):
+        self._process(["https://www.example.com/a.png", "https://www.example.com/b.png", "https://www.example.com/copy-of-a.png", "https://www.example.com/c.png"])
+        self.assertEqual([len(paths) for paths in self.notifier.sent], [2, 1])
+        self.assertTrue(all(path.endswith(".png") for paths in self.notifier.sent for path in paths))
+
+        mock_get = self._process(["https://www.example.com/a.png", "https://www.example.com/c.png"])
+        mock_get.assert_not_called()
+        self.assertEqual(len(self.notifier.sent), 2)
+
+    def test_large_and_non_photo_files_are_rejected(self):
+        self._process(["https://www.example.com/large.png", "https://www.example.com/text.html"])
+        self.assertEqual(self.notifier.sent, [])
+        self.assertEqual([name for name in os.listdir(self.temp_dir.name) if name != "index.json"], [])
+
+        mock_get = self._process(["https://www.example.com/large.png", "https://www.example.com/text.html"])
+        mock_get.assert_not_called()
+
+    def test_index_is_persisted(self):
+        self._process(["https://www.example.com/a.png"])
+        media_cache = MediaCache(self.temp_dir.name, 1024 * 1024)
+        digest = media_cache.get_hash_for_url("https://www.example.com/a.png")
+        self.assertTrue(media_cache.is_sent(digest))
+        self.assertIsNotNone(media_cache.get_path(digest))
+
+    def test_group_is_cut_at_total_size(self):
+        self.media_pipeline.media_group_size = 10
+        self.media_pipeline.max_group_size_in_bytes = 25000
+        self._process(["https://www.example.com/a.png", "https://www.example.com/b.png", "https://www.example.com/c.png"])
+        self.assertEqual([len(paths) for paths in self.notifier.sent], [2, 1])
+
+    def test_process_only_queues(self):
+        batch = Batch(SOURCE_DC_INSIDE, "board", [Post(SOURCE_DC_INSIDE, "board", "title", post_id=1, media_urls=["https://www.example.com/a.png"])])
+        with patch("bbs_crawl_and_notify.media_pipeline.requests.get") as mock_get:
+            self.media_pipeline.process(batch, self.notifier)
+        mock_get.assert_not_called()
+        self.assertEqual(self.media_pipeline.batch_queue.qsize(), 1)
+
+
+class TestMediaCache(unittest.TestCase):
+
+    def test_least_recently_used_files_are_evicted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            media_cache = MediaCache(directory, 150)
+            for (i, digest) in enumerate(["a", "b", "c"]):
+                temp_path = os.path.join(directory, f"{digest}.part")
+                with open(temp_path, "wb") as temp_file:
+                    temp_file.write(b"x" * 60)
+                os.utime(temp_path, (i, i))
+                media_cache.add_file(temp_path, digest, "png")
+            self.assertIsNone(media_cache.get_path("a"))
+            self.assertIsNotNone(media_cache.get_path("c"))
+
+            # The files are found again after a restart.
+            self.assertIsNotNone(MediaCache(directory, 150).get_path("c"))
+
+
+if __name__ == "__main__":
+    unittest.main()
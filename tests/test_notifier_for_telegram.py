@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from bbs_crawl_and_notify.notifier_for_telegram import NotifierForTelegram, format_batch, split_message
+from bbs_crawl_and_notify.post import Batch, Post, SOURCE_DC_INSIDE, SOURCE_FM_KOREA
+
+
+class TestFormatBatch(unittest.TestCase):
+
+    def test_dc_inside(self):
+        batch = Batch(SOURCE_DC_INSIDE, "board", [
+            Post(SOURCE_DC_INSIDE, "board", "second", post_id=2),
+            Post(SOURCE_DC_INSIDE, "board", "first", post_id=1),
+        ], max_of_id=2)
+        self.assertEqual(format_batch(batch), "board\nsecond\nfirst\n")
+
+    def test_fm_korea(self):
+        batch = Batch(SOURCE_FM_KOREA, "football_world", [
+            Post(SOURCE_FM_KOREA, "football_world", "a_b", category="cat"),
+            Post(SOURCE_FM_KOREA, "football_world", "c", category="cat", text="(d)"),
+        ])
+        self.assertEqual(format_batch(batch), "- \\[cat]a\\_b\n- \\[cat]c (\\(d\\))\n")
+
+
+class TestSplitMessage(unittest.TestCase):
+
+    def test_short_message_is_one_chunk(self):
+        self.assertEqual(split_message("a\nb\n"), ["a\nb\n"])
+
+    def test_split_at_line_breaks(self):
+        self.assertEqual(split_message("aaa\nbbb\ncc\n", max_length=8), ["aaa\nbbb\n", "cc\n"])
+
+    def test_long_line_is_cut(self):
+        self.assertEqual(split_message("a\n" + "b" * 10 + "\n", max_length=4), ["a\n", "bbbb", "bbbb", "bb\n"])
+
+
+class TestNotify(unittest.TestCase):
+
+    def setUp(self):
+        self.notifier = NotifierForTelegram()
+        self.notifier.bot_token = "token"
+        self.notifier.bot_chat_id = "chat"
+
+    def test_long_batch_is_posted_in_chunks(self):
+        posts = [Post(SOURCE_DC_INSIDE, "board", f"{i} & " + "x" * 100, post_id=i) for i in range(100)]
+        response = MagicMock()
+        response.json.return_value = {"ok": True, "result": {}}
+        with patch("bbs_crawl_and_notify.notifier_for_telegram.requests.post", return_value=response) as mock_post:
+            self.notifier.notify(Batch(SOURCE_DC_INSIDE, "board", posts, max_of_id=99))
+        texts = [call.kwargs["data"]["text"] for call in mock_post.call_args_list]
+        self.assertGreater(len(texts), 1)
+        self.assertTrue(all(len(text) < 4096 for text in texts))
+        self.assertEqual("".join(texts), format_batch(Batch(SOURCE_DC_INSIDE, "board", posts)))
+        self.assertTrue(mock_post.call_args.args[0].endswith("/bottoken/sendMessage"))
+        self.assertEqual(mock_post.call_args.kwargs["data"]["chat_id"], "chat")
+
+    def test_failure_is_logged(self):
+        response = MagicMock()
+        response.json.return_value = {"ok": False, "description": "Bad Request"}
+        with patch("bbs_crawl_and_notify.notifier_for_telegram.requests.post", return_value=response), \
+                patch("bbs_crawl_and_notify.notifier_for_telegram.logger") as mock_logger:
+            self.notifier.notify(Batch(SOURCE_DC_INSIDE, "board", [Post(SOURCE_DC_INSIDE, "board", "a", post_id=1)], max_of_id=1))
+        self.assertIn("Bad Request", mock_logger.warning.call_args.args[0])
+
+
+class TestSendPhotos(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name in ("a.png", "b.png"):
+            path = os.path.join(self.temp_dir.name, name)
+            with open(path, "wb") as file:
+                file.write(b"x")
+            self.paths.append(path)
+        self.notifier = NotifierForTelegram()
+        self.notifier.bot_token = "token"
+        self.notifier.bot_chat_id = "chat"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_media_group(self):
+        response = MagicMock()
+        response.json.return_value = {"ok": True, "result": [
+            {"photo": [{"file_id": "small-a"}, {"file_id": "a"}]},
+            {"photo": [{"file_id": "small-b"}, {"file_id": "b"}]},
+        ]}
+        with patch("bbs_crawl_and_notify.notifier_for_telegram.requests.post", return_value=response) as mock_post:
+            self.assertEqual(self.notifier.send_photos(self.paths), ["a", "b"])
+        self.assertTrue(mock_post.call_args.args[0].endswith("/sendMediaGroup"))
+        self.assertEqual(set(mock_post.call_args.kwargs["files"]), {"photo0", "photo1"})
+
+    def test_failure(self):
+        response = MagicMock()
+        response.json.return_value = {"ok": False, "description": "Bad Request"}
+        with patch("bbs_crawl_and_notify.notifier_for_telegram.requests.post", return_value=response) as mock_post:
+            self.assertEqual(self.notifier.send_photos(self.paths[:1]), [None])
+        self.assertTrue(mock_post.call_args.args[0].endswith("/sendPhoto"))
+
+
+if __name__ == "__main__":
+    unittest.main()
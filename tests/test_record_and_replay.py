@@ -0,0 +1,87 @@
+import datetime
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import dc_api
+
+from bbs_crawl_and_notify.crawler_for_dc_inside import DCInsideFetchOptions, fetch
+from bbs_crawl_and_notify.record_and_replay import AcceleratedEvent, IOPlayer, IORecorder
+
+
+def create_index(document_id: int) -> dc_api.DocumentIndex:
+    return dc_api.DocumentIndex(
+        id=str(document_id), board_id="board", title=f"title-{document_id}", has_image=False, author="author",
+        time=datetime.datetime(2026, 10, 19, 12, 0), view_count=1, comment_count=0, voteup_count=0,
+        document=None, comments=None, subject=None, image_available=False,
+    )
+
+
+class FakeAPI:
+    async def board(self, board_id, num=-1, start_page=1, document_id_lower_limit=None):
+        for document_id in (3, 2, 1):
+            yield create_index(document_id)
+
+    async def close(self):
+        pass
+
+
+class TestRecordAndReplay(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "session.jsonl.gz")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    async def test_dc_inside_fetch(self):
+        recorder = IORecorder(self.path)
+        fetch_options = DCInsideFetchOptions()
+        fetch_options.api_factory = recorder.create_api_factory()
+        with patch("bbs_crawl_and_notify.record_and_replay.dc_api.API", return_value=FakeAPI()):
+            recorded = await fetch("board", 0, {}, fetch_options)
+        recorder.close()
+
+        player = IOPlayer(self.path)
+        fetch_options.api_factory = player.create_api_factory()
+        replayed = await fetch("board", 0, {}, fetch_options)
+        self.assertEqual([post.title for post in replayed.posts], [post.title for post in recorded.posts])
+        self.assertEqual(replayed.max_of_id, 3)
+        self.assertEqual(replayed.posts[0].time, datetime.datetime(2026, 10, 19, 12, 0))
+
+        # Nothing is left to replay.
+        self.assertEqual(len((await fetch("board", 3, {}, fetch_options)).posts), 0)
+
+    async def test_http_get(self):
+        recorder = IORecorder(self.path)
+        response = MagicMock(status_code=200, headers={"ETag": '"abc"'}, content=b"<html></html>")
+        recording_http_get = recorder.wrap_http_get(MagicMock(return_value=response))
+        recording_http_get("https://www.example.com", timeout=1)
+        recorder.close()
+
+        player = IOPlayer(self.path)
+        replayed = player.http_get("https://www.example.com", timeout=1)
+        self.assertEqual(replayed.status_code, 200)
+        self.assertEqual(replayed.headers["etag"], '"abc"')
+        self.assertEqual(replayed.content, b"<html></html>")
+
+
+class TestAcceleratedEvent(unittest.TestCase):
+
+    def test_wait_is_accelerated(self):
+        exit_event = AcceleratedEvent(speedup=100)
+        started_at = time.monotonic()
+        virtual_started_at = exit_event.monotonic()
+        self.assertFalse(exit_event.wait(15))
+        self.assertLess(time.monotonic() - started_at, 1)
+        self.assertGreaterEqual(exit_event.monotonic() - virtual_started_at, 14)
+
+        exit_event.set()
+        self.assertTrue(exit_event.wait(15))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+import unittest
+from threading import Event, Thread
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.shutdown_coordinator import ShutdownCoordinator
+
+
+class TestShutdownCoordinator(unittest.TestCase):
+
+    def setUp(self):
+        global_config = GlobalConfigIR()
+        global_config.config = {"shutdown": {"deadline_in_sec": 2}}
+        self.coordinator = ShutdownCoordinator()
+        self.coordinator.prepare(global_config)
+        self.global_control_context = {"exit_event": Event()}
+
+    def test_threads_are_joined_against_one_deadline(self):
+        def worker():
+            self.global_control_context["exit_event"].wait()
+            time.sleep(0.5)
+
+        threads = [Thread(target=worker, daemon=True) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+
+        started_at = time.monotonic()
+        self.assertTrue(self.coordinator.shutdown(self.global_control_context))
+        self.assertLess(time.monotonic() - started_at, 2)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+
+    def test_deadline_is_respected_with_stuck_thread(self):
+        release_event = Event()
+        stuck_thread = Thread(target=release_event.wait, args=(10,), daemon=True)
+        stuck_thread.start()
+
+        started_at = time.monotonic()
+        self.assertFalse(self.coordinator.shutdown(self.global_control_context))
+        self.assertLess(time.monotonic() - started_at, 3)
+
+        release_event.set()
+        stuck_thread.join()
+
+    def test_asyncio_tasks_are_cancelled_and_callbacks_run(self):
+        loop = asyncio.new_event_loop()
+        loop_thread = Thread(target=loop.run_forever, daemon=True)
+        loop_thread.start()
+        self.global_control_context["asyncio_loop"] = loop
+
+        cancelled = Event()
+
+        async def long_running():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        asyncio.run_coroutine_threadsafe(long_running(), loop)
+        flushed = Event()
+        self.coordinator.register_callback("flush", lambda timeout: flushed.set())
+
+        self.assertTrue(self.coordinator.shutdown(self.global_control_context))
+        self.assertTrue(cancelled.is_set())
+        self.assertTrue(flushed.is_set())
+        self.assertFalse(loop_thread.is_alive())
+        loop.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
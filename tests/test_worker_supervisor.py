@@ -0,0 +1,103 @@
+import threading
+import unittest
+
+from bbs_crawl_and_notify.global_config_controller import GlobalConfigIR
+from bbs_crawl_and_notify.worker_supervisor import STATE_DEAD, STATE_RUNNING, STATE_STALLED, STATE_STOPPED, WorkerSupervisor
+
+from tests.fake_clock import FakeClock
+
+
+class TestWorkerSupervisor(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.supervisor = WorkerSupervisor(clock=self.clock)
+        global_config = GlobalConfigIR()
+        global_config.config = {
+            "supervisor": {"stall_timeout_in_sec": 60, "backoff_base_in_sec": 10, "backoff_cap_in_sec": 40, "stable_after_in_sec": 100},
+        }
+        self.supervisor.prepare(global_config)
+        self.exit_event = threading.Event()
+        self.release = threading.Event()
+        self.heartbeats = []
+
+    def tearDown(self):
+        self.release.set()
+
+    def _exit_at_once(self, heartbeat):
+        self.heartbeats.append(heartbeat)
+
+    def _block(self, heartbeat):
+        self.heartbeats.append(heartbeat)
+        self.release.wait(10)
+
+    def _join(self, name: str) -> None:
+        self.supervisor.workers[name].thread.join(timeout=5)
+
+    def test_dead_worker_restarts_with_backoff(self):
+        self.supervisor.register("worker", self._exit_at_once)
+        self._join("worker")
+        self.supervisor.check(self.exit_event)
+        self.assertEqual(self.supervisor.get_liveness()["worker"]["state"], STATE_DEAD)
+
+        self.clock.now = 9
+        self.supervisor.check(self.exit_event)
+        self.assertEqual(len(self.heartbeats), 1)
+        self.clock.now = 10
+        self.supervisor.check(self.exit_event)
+        self._join("worker")
+        self.assertEqual(len(self.heartbeats), 2)
+
+        # The second restart waits twice as long.
+        self.supervisor.check(self.exit_event)
+        self.assertEqual(self.supervisor.workers["worker"].restart_at, 30)
+        self.assertEqual(self.supervisor.get_liveness()["worker"]["restart_count"], 1)
+
+    def test_stalled_worker_is_replaced(self):
+        self.supervisor.register("worker", self._block)
+        self.clock.now = 61
+        self.supervisor.check(self.exit_event)
+        self.assertEqual(self.supervisor.workers["worker"].state, STATE_STALLED)
+        self.clock.now = 71
+        self.supervisor.check(self.exit_event)
+        self.assertEqual(self.supervisor.workers["worker"].state, STATE_RUNNING)
+        self.assertEqual(self.supervisor.workers["worker"].generation, 2)
+        self.assertFalse(self.heartbeats[0]())
+        self.assertTrue(self.heartbeats[-1]())
+
+    def test_heartbeat_recovers_stalled_worker(self):
+        self.supervisor.register("worker", self._block)
+        self.clock.now = 61
+        self.supervisor.check(self.exit_event)
+        self.assertTrue(self.heartbeats[0]())
+        self.clock.now = 71
+        self.supervisor.check(self.exit_event)
+        self.assertEqual(self.supervisor.workers["worker"].state, STATE_RUNNING)
+        self.assertEqual(self.supervisor.workers["worker"].generation, 1)
+
+    def test_backoff_resets_once_stable(self):
+        self.supervisor.register("worker", self._block)
+        self.clock.now = 61
+        self.supervisor.check(self.exit_event)
+        self.clock.now = 71
+        self.supervisor.check(self.exit_event)
+        self.clock.now = 171
+        self.heartbeats[-1]()
+        self.supervisor.check(self.exit_event)
+        self.assertEqual(self.supervisor.workers["worker"].consecutive_restarts, 0)
+
+    def test_no_restart_after_exit(self):
+        self.supervisor.register("worker", self._exit_at_once)
+        self._join("worker")
+        self.exit_event.set()
+        self.clock.now = 100
+        self.supervisor.check(self.exit_event)
+        self.assertEqual(self.supervisor.get_liveness()["worker"]["state"], STATE_STOPPED)
+        self.assertEqual(len(self.heartbeats), 1)
+
+    def test_report_includes_sources(self):
+        self.supervisor.register("worker", self._block)
+        self.supervisor.add_report_source("board_health", lambda: {"board": {"state": "closed"}})
+        report = self.supervisor.get_report()
+        self.assertEqual(report["liveness"]["worker"]["state"], STATE_RUNNING)
+        self.assertEqual(report["board_health"], {"board": {"state": "closed"}})